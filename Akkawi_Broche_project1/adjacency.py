@@ -0,0 +1,75 @@
+import numpy as np
+
+from pacman_module.game import Directions
+
+# moves between cells in the order of the engine legal actions
+DIRECTIONS = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]
+VECTORS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+
+
+class MoveAdjacency:
+    def __init__(self, walls):
+        """
+        Legal moves of a layout: the open neighbours of every open cell and
+        the direction leading to each of them, computed once from the walls.
+
+        NOTE:
+            Stored as flat numpy arrays in CSR layout, the moves of the open
+            cell i are the entries offsets[i] to offsets[i + 1] of
+            `neighbours` (open cell reached), `directions` (index of the
+            move in DIRECTIONS) and `sources` (i), in the order of
+            DIRECTIONS. Open cells are indexed in (x, y) order, `flat` gives
+            their index x * height + y in the whole grid.
+
+        Arguments:
+        ----------
+        - `walls`: the grid of walls of the layout (`state.getWalls()`)
+        """
+        self.width = walls.width
+        self.height = walls.height
+        wall_array = np.array([[walls[x][y] for y in range(self.height)] for x in range(self.width)], dtype=bool)
+
+        # index of each open cell, -1 for walls
+        self.index = np.full((self.width, self.height), -1, dtype=np.int64)
+        open_cells = np.argwhere(~wall_array)
+        n_open = len(open_cells)
+        self.index[open_cells[:, 0], open_cells[:, 1]] = np.arange(n_open)
+        self.positions = [(int(x), int(y)) for x, y in open_cells]
+        self.flat = open_cells[:, 0] * self.height + open_cells[:, 1]
+
+        # neighbour of each open cell in each direction, -1 for walls
+        neighbour_table = np.full((n_open, len(VECTORS)), -1, dtype=np.int64)
+        for direction, (dx, dy) in enumerate(VECTORS):
+            x, y = open_cells[:, 0] + dx, open_cells[:, 1] + dy
+            inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+            neighbour_table[inside, direction] = self.index[x[inside], y[inside]]
+
+        legal = neighbour_table >= 0
+        self.offsets = np.zeros(n_open + 1, dtype=np.int64)
+        np.cumsum(legal.sum(axis=1), out=self.offsets[1:])
+        self.sources, self.directions = np.nonzero(legal)
+        self.neighbours = neighbour_table[legal]
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(state.getWalls())
+
+    def cell(self, position):
+        """
+        Return:
+        -------
+        - The index of an open cell, -1 for a wall.
+        """
+        return int(self.index[int(position[0]), int(position[1])])
+
+    def moves(self, cell):
+        """
+        Return:
+        -------
+        - The legal moves of the open cell of index `cell` as a list of
+          (direction, position reached) in the order of DIRECTIONS.
+        """
+        start, end = self.offsets[cell], self.offsets[cell + 1]
+        return [(DIRECTIONS[direction], self.positions[neighbour])
+                for direction, neighbour in zip(self.directions[start:end].tolist(),
+                                                self.neighbours[start:end].tolist())]
@@ -0,0 +1,100 @@
+import numpy as np
+
+from adjacency import DIRECTIONS, MoveAdjacency
+
+UNREACHABLE = np.iinfo(np.uint16).max
+
+
+class MazeDistances:
+    def __init__(self, walls, adjacency=None):
+        """
+        True maze distances (shortest paths avoiding walls) between every
+        pair of open cells of a layout, computed once with a breadth first
+        search started from every open cell at the same time.
+
+        NOTE:
+            Distances are stored in a [n_open, n_open] uint16 numpy array,
+            cells that cannot reach each other are UNREACHABLE apart: this
+            is not a distance, users must test it (see `reachable`).
+            Open cells are indexed as in the MoveAdjacency of the layout,
+            whose moves give the neighbours of the search.
+
+        Arguments:
+        ----------
+        - `walls`: the grid of walls of the layout (`state.getWalls()`)
+        - `adjacency`: the MoveAdjacency of the layout (see adjacency.py),
+          built from `walls` if None
+        """
+        if adjacency is None:
+            adjacency = MoveAdjacency(walls)
+        self.width = adjacency.width
+        self.height = adjacency.height
+        self.index = adjacency.index
+        self.positions = adjacency.positions
+        self.coordinates = np.array(self.positions, dtype=np.int64).reshape(-1, 2)
+        n_open = len(self.positions)
+
+        self.table = np.full((n_open, n_open), UNREACHABLE, dtype=np.uint16)
+        frontier = np.eye(n_open, dtype=bool)
+        reached = frontier.copy()
+        distance = 0
+        while frontier.any():
+            self.table[frontier] = distance
+            distance += 1
+            next_frontier = np.zeros_like(frontier)
+            # one direction at a time: no two cells share a neighbour in the same direction
+            for direction in range(len(DIRECTIONS)):
+                moves = adjacency.directions == direction
+                next_frontier[:, adjacency.neighbours[moves]] |= frontier[:, adjacency.sources[moves]]
+            frontier = next_frontier & ~reached
+            reached |= frontier
+
+    @classmethod
+    def from_state(cls, state, adjacency=None):
+        return cls(state.getWalls(), adjacency)
+
+    def cell(self, position):
+        """
+        Return:
+        -------
+        - The index of an open cell in the table.
+        """
+        return int(self.index[int(position[0]), int(position[1])])
+
+    def position(self, cell):
+        """
+        Return:
+        -------
+        - The (x, y) position of the open cell of index `cell`.
+        """
+        return self.positions[cell]
+
+    def distance(self, position1, position2):
+        """
+        Return:
+        -------
+        - The maze distance between two open cells, UNREACHABLE if they
+          are not connected.
+        """
+        return int(self.table[self.index[int(position1[0]), int(position1[1])],
+                              self.index[int(position2[0]), int(position2[1])]])
+
+    def reachable(self, position, cells):
+        """
+        Return:
+        -------
+        - The entries of the numpy array of open cell indices `cells` that
+          can be reached from `position`.
+        """
+        return cells[self.table[self.cell(position), cells] != UNREACHABLE]
+
+    def nearest_distance(self, position, positions):
+        """
+        Return:
+        -------
+        - The maze distance from `position` to the nearest of `positions`
+          that can be reached from it, None if none can.
+        """
+        distances = [self.distance(position, other) for other in positions]
+        distances = [distance for distance in distances if distance != UNREACHABLE]
+        return min(distances) if distances else None
@@ -0,0 +1,52 @@
+from collections import OrderedDict
+
+
+class EvaluationCache:
+    def __init__(self, size=2 ** 16):
+        """
+        Cache of the evaluations of cut-off states kept by a PacmanAgent from
+        one move to the next, indexed by the zobrist key of the states.
+
+        NOTE:
+            Memory is capped at `size` entries, the least recently used
+            entries are evicted first. A size of 0 disables the cache.
+
+        Arguments:
+        ----------
+        - `size`: maximum number of entries
+        """
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Return:
+        -------
+        - The value stored for `key`, None if not stored.
+        """
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if self.size <= 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def hit_rate(self):
+        """
+        Return:
+        -------
+        - The fraction of the lookups answered by the cache so far.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.
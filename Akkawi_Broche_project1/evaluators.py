@@ -0,0 +1,187 @@
+"""
+Evaluation functions of the search agents, registered by name so that the
+search engine (see 'search.py') can be configured with any of them.
+
+An evaluator is called as evaluator(state, maze_distances, food) on the
+cut-off and WIN/LOSE states, with the maze distances of the layout and the
+remaining food dots of the state (see 'food.food_cells'), both None when the
+evaluator is registered with needs_maze_distances=False.
+"""
+
+import numpy as np
+
+from food import nearest_food
+
+EVALUATORS = dict()
+
+
+def register_evaluator(name, needs_maze_distances=True):
+    """
+    Registers the decorated evaluation function under `name`.
+    """
+    def register(function):
+        function.needs_maze_distances = needs_maze_distances
+        EVALUATORS[name] = function
+        return function
+    return register
+
+
+def get_evaluator(name):
+    """
+    Return:
+    -------
+    - The evaluation function registered under `name`.
+    """
+    if name not in EVALUATORS:
+        raise ValueError("Unknown evaluator '{}', expected one of {}".format(name, sorted(EVALUATORS)))
+    return EVALUATORS[name]
+
+
+def nearest_ghost_distance(state, maze_distances):
+    """
+    Returns the maze distance between Pacman and the nearest ghost it can
+    reach, 0 if it reaches none (no ghost can ever catch it, the term is the
+    same for all the states searched).
+    """
+    distance = maze_distances.nearest_distance(state.getPacmanPosition(), state.getGhostPositions())
+    return 0 if distance is None else distance
+
+
+@register_evaluator("score", needs_maze_distances=False)
+def score_eval(state, maze_distances=None, food=None):
+    """
+    Returns the score of the state, the exact utility of the WIN/LOSE states
+    searched by minimax.
+    """
+    return state.getScore()
+
+
+@register_evaluator("nearest_food")
+def nearest_food_eval(state, maze_distances, food):
+
+    """
+    Given a state (AT CUTOFF or WIN/LOSE)
+        Hminimax0:  + the current state score
+                    + the distance of pacman to ghost * 0.5 (because pacman can still progress,
+                                                                even if ghost is following him)
+                    - the distance of pacman to nearest food dot
+
+    Returns an evaluation(heuristic) of a given state.
+
+    Arguments:
+    ----------
+    - 'state': the current game state.
+    - 'maze_distances': maze distances of the layout (`MazeDistances`)
+    - 'food': remaining food dots of the state (see `food.food_cells`)
+
+
+    Return:
+    -------
+    - The value of the evaluation.
+    """
+
+    pacman_position = state.getPacmanPosition()
+    # food dots in another part of the maze can never be eaten
+    food = maze_distances.reachable(pacman_position, food)
+
+    # distance between Pacman and closest Food dot
+    if len(food):
+        dist_Pacman_food, _ = nearest_food(food, pacman_position, maze_distances)
+    else:
+        dist_Pacman_food = 0
+
+    # distance between PacMan and the nearest Ghost
+    dist_Pacman_Ghost = nearest_ghost_distance(state, maze_distances)
+
+    return state.getScore() - dist_Pacman_food + dist_Pacman_Ghost*(state.isWin() is False)/2
+
+
+def split_grid(food, _my_splitter, maze_distances):
+    """
+        Given the food dots, an initial food dot splitter and the maze distances, does a series
+        of scans to compute the dot-to-dot distances as described in report.
+        At each step, the remaining dots are split in 4 quadrants around the splitter, the splitter
+        is removed and the nearest dot of the most populated quadrant becomes the next splitter.
+
+        NOTE:
+            The quadrants are computed with numpy masks over the coordinates of the remaining dots,
+            one step per dot without recursion (no recursion limit on food dense layouts).
+            Ties are broken as in the recursive version: the last of the most populated quadrants
+            in N_W, N_E, S_W, S_E order and the first nearest dot in grid order.
+
+        Arguments:
+        ----------
+        - `food`: remaining food dots at the cut-off state (see `food.food_cells`).
+        - '_my_splitter': initial food point splitter
+        - 'maze_distances': maze distances of the layout
+
+        Return:
+        -------
+        - The list of maze distances between successive splitters
+    """
+    all_distances = []
+    xs = maze_distances.coordinates[food, 0]
+    ys = maze_distances.coordinates[food, 1]
+    remaining = np.ones(len(food), dtype=bool)
+    splitter = int(np.searchsorted(food, maze_distances.cell(_my_splitter)))
+
+    while True:
+        remaining[splitter] = False
+        if not remaining.any():
+            return all_distances
+        x, y = xs[splitter], ys[splitter]
+        my_zone = [remaining & (xs <= x) & (ys < y),  # N_W
+                   remaining & (xs > x) & (ys <= y),  # N_E
+                   remaining & (xs < x) & (ys >= y),  # S_W
+                   remaining & (xs >= x) & (ys > y)]  # S_E
+        sizes = [zone.sum() for zone in my_zone]
+        largest = len(sizes) - 1 - sizes[::-1].index(max(sizes))
+        candidates = np.flatnonzero(my_zone[largest])
+        distances = maze_distances.table[food[splitter], food[candidates]]
+        nearest = int(distances.argmin())
+        all_distances.append(int(distances[nearest]))
+        splitter = candidates[nearest]
+
+
+@register_evaluator("split_grid")
+def split_grid_eval(state, maze_distances, food):
+
+    """
+        Given a state (AT CUTOFF or WIN/LOSE)
+        Hminimax1:  + the current state score
+                    + the distance of pacman to ghost * 0.5 (because pacman can still progress,
+                                                                even if ghost is following him)
+                    - the distance of pacman to nearest food dot
+                    - sum of distances as defined in split grid (predicted path of pacman to eat all dots)
+        Hminimax2 is Same as Hminimax1.
+
+        Returns an evaluation(heuristic) of a given state.
+
+        Arguments:
+        ----------
+        - 'state': the current game state.
+        - 'maze_distances': maze distances of the layout (`MazeDistances`)
+        - 'food': remaining food dots of the state (see `food.food_cells`)
+
+
+        Return:
+        -------
+        - The value of the evaluation.
+    """
+
+    pacman_position = state.getPacmanPosition()
+    # food dots in another part of the maze can never be eaten
+    food = maze_distances.reachable(pacman_position, food)
+
+    # distance between PacMan and the nearest Ghost
+    dist_Pacman_Ghost = nearest_ghost_distance(state, maze_distances)
+
+    # distance between Pacman and closest Food dot and food path created by split grid
+    if len(food):
+        dist_Pacman_food, my_splitter = nearest_food(food, pacman_position, maze_distances)
+        all_distances = split_grid(food, my_splitter, maze_distances)
+        return state.getScore() - dist_Pacman_food + dist_Pacman_Ghost*(state.isWin() is False)/2 - sum(all_distances)
+    else:
+        dist_Pacman_food = 0
+        return state.getScore() - dist_Pacman_food + dist_Pacman_Ghost*(state.isWin() is False)/2
+
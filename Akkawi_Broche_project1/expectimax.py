@@ -0,0 +1,79 @@
+# Complete this class for all parts of the project
+
+from search import SearchAgent
+from search_state import MOVE_VECTORS
+
+# exponent k of the weight 2 ** k of the ghost moves going away from Pacman,
+# as in the transition model of BeliefStateAgent (project 2)
+GHOST_EXPONENTS = {
+    "scared": 3,
+    "afraid": 1,
+    "confused": 0,
+}
+
+
+class PacmanAgent(SearchAgent):
+    def __init__(self, args):
+        """
+        Expectimax search cut off at depth 4, the cut-off states are evaluated with the split grid food
+        path (see evaluators.split_grid_eval) and the evaluation cache of search.SearchAgent.
+        The ghost nodes are the chance nodes of search.SearchAgent.search_value, the other options of
+        SearchAgent (time budget, workers, ghost radius, tablebase, statistics) apply as for minimax.
+
+        Arguments:
+        ----------
+        - `args`: Namespace of arguments from command-line prompt (see search.SearchAgent), with
+          'ghostagent' the type of the ghosts and 'valuebounds' the (lower, upper) bounds of the
+          eval values.
+
+        Attributes:
+        -----------
+                - type of the ghosts (scared, afraid or confused), giving the probabilities of their moves,
+                  None for the default exponent 1
+                - (lower, upper) bounds of the eval values enabling star1 pruning of the chance nodes,
+                  None to search every ghost move; evaluations are clamped to these bounds
+                - the transposition table keeps the MAX and chance nodes
+        """
+        super().__init__(args, evaluator="split_grid", max_depth=4)
+        self.chance_nodes = True
+        self.ghost_type = getattr(args, 'ghostagent', None)
+        if self.ghost_type is not None and self.ghost_type not in GHOST_EXPONENTS:
+            raise ValueError("Unknown ghost type '{}', expected one of {}".format(self.ghost_type,
+                                                                                 sorted(GHOST_EXPONENTS)))
+        self.value_bounds = getattr(args, 'valuebounds', None)
+        if self.value_bounds is not None:
+            lower, upper = self.value_bounds
+            if not lower < upper:
+                raise ValueError("The value bounds must be (lower, upper) with lower < upper, got {}".format(
+                    self.value_bounds))
+            self.value_bounds = (float(lower), float(upper))
+
+    def evaluate(self, state, current, food):
+        """
+            Returns the eval value of state (see SearchAgent.evaluate), clamped to value_bounds if any: star1
+            pruning is only sound if every value lies within the bounds.
+        """
+        value = super().evaluate(state, current, food)
+        if self.value_bounds is not None:
+            lower, upper = self.value_bounds
+            value = min(max(value, lower), upper)
+        return value
+
+    def ghost_probabilities(self, state, ghost, moves):
+        """
+            Returns the probability of each move of ghost `ghost` in state: the moves increasing the manhattan
+            distance to Pacman are 2 ** k more likely than the others, k depending on the ghost type
+            (same model as BeliefStateAgent._get_transition_model). A ghost staying still (see ghost_radius)
+            keeps its position with probability 1.
+        """
+        k = 1 if self.ghost_type is None else GHOST_EXPONENTS[self.ghost_type]
+        pacman_x, pacman_y = state.getPacmanPosition()
+        ghost_x, ghost_y = state.getGhostPosition(ghost)
+        distance = abs(ghost_x - pacman_x) + abs(ghost_y - pacman_y)
+        weights = []
+        for move in moves:
+            dx, dy = MOVE_VECTORS.get(move, (0, 0))
+            next_distance = abs(ghost_x + dx - pacman_x) + abs(ghost_y + dy - pacman_y)
+            weights.append(2. ** k if next_distance > distance else 1.)
+        total = sum(weights)
+        return [weight / total for weight in weights]
@@ -0,0 +1,40 @@
+import numpy as np
+
+
+def food_cells(state, maze_distances):
+    """
+    Returns the remaining food dots of a state as a sorted numpy array of
+    open cell indices (see `MazeDistances.cell`). The food grid is scanned
+    here, once per move, the search then updates the array incrementally.
+
+    Arguments:
+    ----------
+    - `state`: the current game state.
+    - `maze_distances`: maze distances of the layout (`MazeDistances`)
+    """
+    cells = [maze_distances.cell(food) for food in state.getFood().asList()]
+    return np.array(sorted(cells), dtype=np.int64)
+
+
+def after_pacman_move(food, next_state, maze_distances):
+    """
+    Returns the food dots of `next_state`, reached by a Pacman move from a
+    state whose food dots are `food`: only the dot under Pacman can be eaten,
+    the array is shared with the parent when no dot is eaten.
+    """
+    cell = maze_distances.cell(next_state.getPacmanPosition())
+    index = np.searchsorted(food, cell)
+    if index < len(food) and food[index] == cell:
+        return np.delete(food, index)
+    return food
+
+
+def nearest_food(food, position, maze_distances):
+    """
+    Returns the maze distance to the nearest food dot from `position` and
+    the position of this dot (the first one in grid order in case of ties).
+    `food` must not be empty.
+    """
+    distances = maze_distances.table[maze_distances.cell(position), food]
+    nearest = int(distances.argmin())
+    return int(distances[nearest]), maze_distances.position(food[nearest])
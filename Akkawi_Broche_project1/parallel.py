@@ -0,0 +1,72 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+# process pools shared by the agents of a process, one per number of workers
+_executors = dict()
+
+
+def get_executor(workers):
+    """
+    Returns the process pool of `workers` workers, created at the first call
+    and reused by every move (starting the workers costs more than a move).
+    """
+    if workers not in _executors:
+        _executors[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _executors[workers]
+
+
+def _search_child(agent, child, alpha):
+    """
+    Runs in a worker: searches one root child with a copy of the agent and
+    returns its value and whether the search reached the cut-off depth.
+    """
+    value = agent.search_child(child, dict(), alpha)
+    return value, getattr(agent, 'depth_cut', False)
+
+
+def young_brothers_wait(agent, children, order, visited, workers):
+    """
+    Root-parallel alpha-beta search of the children of the root (MAX) node.
+
+    NOTE:
+        The first child in `order` (eldest brother) is searched in this
+        process with the shared `visited` dictionary, the others are then
+        searched in parallel by the process pool with its value as alpha
+        (slightly lower for the children generated before it, so that ties
+        are still broken in generation order). Each worker uses its own copy
+        of the agent tables and an empty visited dictionary.
+        Values are merged in generation order whatever the order in which
+        the workers finish, so the result does not depend on scheduling.
+
+    Arguments:
+    ----------
+    - `agent`: the searching agent, children are searched with its
+      `search_child(child, visited, alpha)` method
+    - `children`: the root children, as expected by `search_child`
+    - `order`: indices of the children in search order
+    - `visited`: visited states dictionary of the root search
+    - `workers`: number of worker processes
+
+    Return:
+    -------
+    - The maximum value and the index of the (first generated) child
+      reaching it.
+    """
+    first = order[0]
+    values = {first: agent.search_child(children[first], visited, float('-inf'))}
+
+    executor = get_executor(workers)
+    futures = dict()
+    for index in order[1:]:
+        alpha = values[first]
+        if index < first:
+            alpha = math.nextafter(alpha, float('-inf'))
+        futures[index] = executor.submit(_search_child, agent, children[index], alpha)
+
+    for index, future in futures.items():
+        values[index], depth_cut = future.result()
+        if depth_cut:
+            agent.depth_cut = True
+
+    best = min(values, key=lambda index: (-values[index], index))
+    return values[best], best
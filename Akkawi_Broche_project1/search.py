@@ -0,0 +1,604 @@
+import math
+import time
+
+from pacman_module.game import Agent
+
+from distances import MazeDistances
+from evaluation_cache import EvaluationCache
+from evaluators import get_evaluator
+from food import after_pacman_move, food_cells
+from parallel import young_brothers_wait
+from search_state import SearchRules, make_search_state
+from search_stats import make_search_stats
+from tablebase import open_tablebase
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+from zobrist import ZobristHasher
+
+
+class SearchTimeout(Exception):
+    """
+        Raised when the time budget of a move runs out in the middle of a search.
+    """
+
+
+class SearchAgent(Agent):
+    def __init__(self, args, evaluator, max_depth=None, eval_cache_size=2 ** 16, hasher=ZobristHasher):
+        """
+        Alpha-beta minimax search shared by the minimax and hminimax agents, configured with an evaluator,
+        a cut-off policy and a key function.
+
+        Arguments:
+        ----------
+        - `args`: Namespace of arguments from command-line prompt, the evaluator can be replaced by name
+          with its 'evaluator' argument
+        - `evaluator`: name of the evaluation function of the cut-off states (see evaluators.py)
+        - `max_depth`: cut-off depth (one level per player), None to search until WIN/LOSE states
+        - `eval_cache_size`: default size of the evaluation cache
+        - `hasher`: class giving the keys of the states, built from the first state with
+          `from_state`, updated with `pacman_step` and `ghost_step` and turned into the keys of the
+          transposition table with `node_key` (see zobrist.py)
+
+        Attributes:
+        -----------
+                - depth of minimax added pacman-agent class level
+                - a dictionry of keys with their corresponding actions as values
+                - zobrist hasher of the layout giving the keys of the states (built at the first move)
+                - rules of the states searched with make/unmake (built at the first move, see search_state.py)
+                - maze distances between every pair of cells of the layout (built at the first move),
+                  None when neither the evaluator nor ghost_radius use them
+                - the action taken at the previous turn, searched first at the next one
+                - transposition table of the searched states, kept from one move to the next
+                - cache of the evaluations of the cut-off states, kept from one move to the next
+                - maze distance to Pacman beyond which ghosts are not expanded (they stay still),
+                  None to expand every ghost
+                - number of worker processes searching the root moves in parallel, None to search them
+                  one after another in this process
+                - statistics of the searches (see search_stats.py), None when not recorded
+                - time budget (in seconds) of a move, None to always search at depth max_depth,
+                  otherwise the search is deepened one level at a time until the budget runs out
+                - endgame tablebase probed before searching (see tablebase.py), None without the
+                  'tablebase' argument
+                - whether the ghost nodes are chance nodes, valued by the expectation of their moves (see
+                  ghost_probabilities), instead of MIN nodes
+                - (lower, upper) bounds of the eval values enabling star1 pruning of the chance nodes, None
+                  to search every ghost move
+        """
+        self.max_depth = max_depth
+        self.evaluator = get_evaluator(getattr(args, 'evaluator', None) or evaluator)
+        self.hasher = hasher
+        self.actions_taken = dict()
+        self.zobrist = None
+        self.rules = None
+        self.maze_distances = None
+        self.last_action = None
+        self.transpositions = TranspositionTable(getattr(args, 'ttsize', 2 ** 16))
+        self.evaluations = EvaluationCache(getattr(args, 'evalcachesize', eval_cache_size))
+        self.ghost_radius = getattr(args, 'ghostradius', None)
+        self.workers = getattr(args, 'workers', None)
+        self.stats = make_search_stats(args)
+        self.time_budget = getattr(args, 'timebudget', None)
+        self.deadline = None
+        self.depth_cut = False
+        self.tablebase = open_tablebase(args)
+        self.chance_nodes = False
+        self.value_bounds = None
+
+    def get_action(self, state):
+        """
+        Given a pacman game state, returns a legal move.
+
+        NOTE:
+            Get_action is calculated at each state given that Pacman doesn't know how the ghost will behave,
+            So Minimax will find the optimal action of PacMan but the ghost might react to this action differently
+            to what is expected.
+            Positions found in the endgame tablebase are not searched, Pacman plays the move winning fastest.
+
+        Arguments:
+        ----------
+        - `state`: the current game state. See FAQ and class
+                   `pacman.GameState`.
+
+        Return:
+        -------
+        - A legal move as defined in `game.Directions`.
+        """
+        if self.stats is not None:
+            self.stats.start_move()
+        if self.zobrist is None:
+            self.zobrist = self.hasher.from_state(state)
+        if self.rules is None:
+            self.rules = SearchRules(state.getWalls())
+        if self.maze_distances is None and (self.evaluator.needs_maze_distances or self.ghost_radius is not None):
+            self.maze_distances = MazeDistances.from_state(state, self.rules.adjacency)
+        self.transpositions.new_search()
+        if self.stats is not None:
+            self.stats.lap('setup')
+
+        probed = None
+        if self.tablebase is not None:
+            probed = self.tablebase.probe(make_search_state(state, self.rules))
+            if self.stats is not None:
+                self.stats.lap('tablebase')
+
+        if probed is not None:
+            utility, action = probed
+        elif self.time_budget is None:
+            my_visited_states = dict()
+            my_action_dict = dict()
+            utility = self.initial_maximize_value(state, my_visited_states, my_action_dict, self.last_action)
+            action = my_action_dict[utility]
+        else:
+            utility, action = self.iterative_deepening(state)
+        if self.stats is not None:
+            self.stats.lap('search')
+
+        self.actions_taken[self.zobrist.key(state)] = utility
+        self.last_action = action
+        if self.stats is not None:
+            self.stats.end_move(action)
+        return action
+
+    def iterative_deepening(self, state):
+        """
+            Searches at depth 1, 2, 3, ... until the time budget of the move runs out.
+            NOTE:
+                Depth 1 is always completed so that an action is always found. Each iteration searches
+                first the best action of the previous one, deepening stops early once an iteration
+                reached no cut-off depth (the whole game tree was searched).
+                With search statistics, the time of each completed iteration is recorded as phase depth_<d>.
+
+            Arguments:
+            ----------
+            state: the game state under study
+
+            Return:
+            -------
+            the eval value and the action of the deepest completed iteration
+        """
+        deadline = time.perf_counter() + self.time_budget
+        default_depth = self.max_depth
+        first_action = self.last_action
+        depth = 1
+        try:
+            while True:
+                my_visited_states = dict()
+                my_action_dict = dict()
+                self.max_depth = depth
+
+                utility = self.initial_maximize_value(state, my_visited_states, my_action_dict, first_action)
+                first_action = my_action_dict[utility]
+                if self.stats is not None:
+                    self.stats.lap('depth_{}'.format(depth))
+                if not self.depth_cut:
+                    break
+                depth += 1
+                self.deadline = deadline
+        except SearchTimeout:
+            pass
+        finally:
+            self.max_depth = default_depth
+            self.deadline = None
+
+        return utility, first_action
+
+    def initial_maximize_value(self, state, visited, action_dict, first_action=None):
+        """
+            Implementation of the alpha-beta search pseudo code of lecture.
+            NOTE:
+                Here we consider that Pacman (MAX player) is starting the game and his actions are to be recorded.
+                first_action and the best evaluated moves are searched first. Moves generated before the
+                current best one are searched with a slightly lower alpha, so that ties are still broken in
+                generation order and the chosen action is the one of the search without pruning.
+                With worker processes, the first move is searched here and the others in parallel (see
+                parallel.young_brothers_wait).
+                depth_cut tells after the search whether it reached the cut-off depth.
+                The game state is converted here to the state searched with make/unmake (see
+                search_state.make_search_state), the chosen move is already a `Directions` action.
+
+            Arguments:
+            ----------
+            state: the game state under study
+            visited: dictionary of the states on the search path (and of the memoized values, see memoized)
+            action_dict: dictionary that stores the Action to take for each corresponding eval value
+            first_action: action searched first (previous turn or previous iteration best action)
+
+            Return:
+            -------
+            maximum eval value
+
+            Void:
+            -----
+            Fills action dictionary
+            Fills visited states dictionary
+        """
+        current = self.zobrist.key(state)
+        food = food_cells(state, self.maze_distances) if self.maze_distances is not None else None
+        uti_val = float('-inf')
+        current_depth = 0
+        uti_action = None
+        uti_index = None
+        self.depth_cut = False
+        if self.stats is not None:
+            self.stats.node(current_depth)
+
+        root = make_search_state(state, self.rules)
+        moves, keys, foods, order = self.expand(root, current, food, current_depth, 0)
+        order.sort(key=lambda index: moves[index] != first_action)
+
+        children = []
+        for move, next_key, next_food in zip(moves, keys, foods):
+            next_state = root.copy()
+            next_state.make(0, move)
+            children.append((next_state, next_key, next_food))
+        if self.workers is not None and len(order) > 1:
+            uti_val, uti_index = young_brothers_wait(self, children, order, visited, self.workers)
+            uti_action = moves[uti_index]
+        else:
+            for index in order:
+                alpha = uti_val
+                if uti_index is not None and index < uti_index:
+                    alpha = math.nextafter(uti_val, float('-inf'))
+                my_max = self.search_child(children[index], visited, alpha)
+                if uti_val < my_max or (uti_index is not None and uti_val == my_max and index < uti_index):
+                    uti_val = my_max
+                    uti_action = moves[index]
+                    uti_index = index
+
+        action_dict[uti_val] = uti_action
+        visited[current] = uti_val
+        self.transpositions.store(self.zobrist.node_key(current, 0), self.remaining_depth(current_depth),
+                                  uti_val - state.getScore(), EXACT, self.depth_cut, uti_action)
+        return uti_val
+
+    def search_child(self, child, visited, alpha):
+        """
+            Returns the value of a child (next state, zobrist key, food dots) of the root, searched with
+            the given alpha (see initial_maximize_value), in this process or in a worker of the process pool.
+        """
+        next_state, next_key, next_food = child
+        return self.search_value(next_state, next_key, next_food, visited, 1, alpha, float('inf'), 1)
+
+    def next_food(self, food, next_state):
+        """
+            Returns the food dots of a state reached by a Pacman move (see food.after_pacman_move), None when
+            the food dots are not tracked.
+        """
+        if food is None:
+            return None
+        return after_pacman_move(food, next_state, self.maze_distances)
+
+    def remaining_depth(self, current_depth):
+        """
+            Returns the depth still to be searched below a node at current_depth, infinite without cut-off depth.
+        """
+        if self.max_depth is None:
+            return math.inf
+        return self.max_depth - current_depth
+
+    def memoized(self):
+        """
+            Returns whether the values of the searched states are reused wherever the states are reached again
+            (visited states and transposition table), only when the game tree is searched until WIN/LOSE states.
+            NOTE:
+                The value of a state depends on the path leading to it (states on the path are not searched
+                again) and, with a cut-off depth, on its depth: reusing it on another path or at another depth
+                changes the values of the search, so that pruning could change the chosen action. With a cut-off
+                depth, states are thus only memoized along the search path and every value is the one of the
+                search without pruning. Without cut-off depth, the game tree can only be searched with memoization.
+        """
+        return self.max_depth is None
+
+    def cutoff_test(self, state, depth):
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        if state.isWin() or state.isLose():
+            return True
+        if depth == self.max_depth:
+            self.depth_cut = True
+            return True
+        return False
+
+    def evaluate(self, state, current, food):
+        """
+            Returns evaluator(state), its part that does not depend on the score is taken from the
+            evaluation cache when a state of same key (same positions and food dots) was already evaluated.
+        """
+        if self.stats is not None:
+            self.stats.evals += 1
+        value = self.evaluations.get(current)
+        if value is None:
+            value = self.evaluator(state, self.maze_distances, food) - state.getScore()
+            self.evaluations.put(current, value)
+        return state.getScore() + value
+
+    def expand(self, state, current, food, current_depth, ghost):
+        """
+            Returns the legal moves of Pacman (ghost 0) or of ghost `ghost` in state, the zobrist keys and food dots
+            of the states they lead to, and the order in which they are searched: by decreasing (MAX) or increasing
+            (MIN) eval value, so that the best moves are searched first and pruning happens early.
+            Successors at the cut-off depth are evaluated anyway and are left in generation order.
+            The best move stored in the transposition table for the node, by a search of this move or of a
+            previous one at any depth, is searched first.
+            Ghosts too far from Pacman stay still (see ghost_radius).
+            The moves of chance nodes are always searched in generation order.
+            Each move is made then unmade on state, which is left unchanged.
+        """
+        if ghost == 0:
+            moves = state.legal_moves(0)
+        elif self.ghost_radius is not None and self.maze_distances.distance(
+                state.getPacmanPosition(), state.getGhostPosition(ghost)) > self.ghost_radius:
+            moves = [None]
+        else:
+            moves = state.legal_moves(ghost)
+
+        chance = ghost != 0 and self.chance_nodes
+        ordered = (not chance and (self.max_depth is None or current_depth + 1 < self.max_depth)
+                   and len(moves) > 1)
+        keys, foods, values = [], [], []
+        for move in moves:
+            record = state.make(ghost, move)
+            if ghost == 0:
+                next_key = self.zobrist.pacman_step(current, record[1], state.getPacmanPosition(), record[2])
+                next_food = self.next_food(food, state)
+            else:
+                next_key = self.zobrist.ghost_step(current, ghost, record[1], state.getGhostPosition(ghost))
+                next_food = food
+            keys.append(next_key)
+            foods.append(next_food)
+            if ordered:
+                values.append(self.evaluate(state, next_key, next_food))
+            state.unmake(record)
+
+        order = list(range(len(moves)))
+        if ordered:
+            order.sort(key=lambda index: values[index], reverse=ghost == 0)
+        if len(moves) > 1 and not chance:
+            best_move = self.transpositions.best_move(self.zobrist.node_key(current, ghost))
+            if best_move in moves:
+                if self.stats is not None:
+                    self.stats.transposition_move_hits += 1
+                order.sort(key=lambda index: moves[index] != best_move)
+        return moves, keys, foods, order
+
+    def search_value(self, state, current, food, visited, current_depth, alpha, beta, ghost=0):
+        """
+            Implementation of the alpha-beta search pseudo code of lecture, without recursion.
+            returns the value of state, a MAX node when ghost is 0 (Pacman to move), a MIN node (or a chance node,
+            see chance_nodes) of ghost `ghost` otherwise
+            NOTE:
+                The nodes being searched are kept in an explicit stack of frames (see SearchFrame) instead of
+                the mutual recursion of maximize and minimize functions: the search is not bounded by the
+                recursion limit of python and pays no function call per node. Nodes are searched in the same
+                order and with the same bounds as with the recursion.
+                state (see search_state.py) is moved from node to node with make/unmake, it is back to the
+                searched node when the search returns.
+        """
+        value, frame = self.enter_node(state, current, food, visited, current_depth, alpha, beta, ghost)
+        if frame is None:
+            return value
+        stack = [frame]
+        n_agents = state.getNumAgents()
+        while stack:
+            frame = stack[-1]
+            if value is not None:
+                # value of the last searched child of frame
+                if frame.ghost == 0:
+                    if value > frame.value:
+                        frame.value = value
+                        frame.best = frame.moves[frame.order[frame.position - 1]]
+                    if frame.value >= frame.beta:
+                        if self.stats is not None:
+                            self.stats.cutoffs += 1
+                        frame.position = len(frame.order)
+                    else:
+                        frame.alpha = max(frame.alpha, frame.value)
+                elif frame.probabilities is None:
+                    if value < frame.value:
+                        frame.value = value
+                        frame.best = frame.moves[frame.order[frame.position - 1]]
+                    if frame.value <= frame.alpha:
+                        if self.stats is not None:
+                            self.stats.cutoffs += 1
+                        frame.position = len(frame.order)
+                    else:
+                        frame.beta = min(frame.beta, frame.value)
+                else:
+                    frame.value += frame.probabilities[frame.order[frame.position - 1]] * value
+                    if self.value_bounds is not None:
+                        lower, upper = self.value_bounds
+                        if frame.value + frame.remaining * upper <= frame.alpha:
+                            bound = upper
+                        elif frame.value + frame.remaining * lower >= frame.beta:
+                            bound = lower
+                        else:
+                            bound = None
+                        if bound is not None:
+                            if self.stats is not None:
+                                self.stats.cutoffs += 1
+                            frame.value += frame.remaining * bound
+                            frame.position = len(frame.order)
+                value = None
+
+            if frame.position == len(frame.order):
+                stack.pop()
+                value = self.leave_node(frame, visited, state)
+                if frame.record is not None:
+                    state.unmake(frame.record)
+                continue
+
+            index = frame.order[frame.position]
+            frame.position += 1
+            alpha, beta = self.child_window(frame, index)
+            record = state.make(frame.ghost, frame.moves[index])
+            if frame.ghost == 0:
+                value, child = self.enter_node(state, frame.keys[index], frame.foods[index], visited,
+                                               frame.depth + 1, alpha, beta, 1)
+            elif frame.ghost + 1 < n_agents:
+                value, child = self.enter_node(state, frame.keys[index], frame.food, visited, frame.depth,
+                                               alpha, beta, frame.ghost + 1)
+            else:
+                value, child = self.enter_node(state, frame.keys[index], frame.food, visited, frame.depth + 1,
+                                               alpha, beta, 0)
+            if child is None:
+                state.unmake(record)
+            else:
+                child.record = record
+                stack.append(child)
+        return value
+
+    def child_window(self, frame, index):
+        """
+            Returns the (alpha, beta) window in which the move `index` of frame is searched: the window of frame
+            for MAX and MIN nodes.
+            NOTE:
+                The move of a chance node is searched with the window outside of which the expectation is known to
+                be outside of the window of the node, whatever the values of its remaining moves (star1 pruning),
+                so that the node is cut as soon as this happens. Without value_bounds, every move of a chance node
+                is searched with an infinite window.
+                The probability of the move is taken off the remaining probability of frame.
+        """
+        if frame.probabilities is None:
+            return frame.alpha, frame.beta
+        probability = frame.probabilities[index]
+        frame.remaining = max(frame.remaining - probability, 0.)
+        if self.value_bounds is None:
+            return float('-inf'), float('inf')
+        lower, upper = self.value_bounds
+        return ((frame.alpha - frame.value - frame.remaining * upper) / probability,
+                (frame.beta - frame.value - frame.remaining * lower) / probability)
+
+    def ghost_probabilities(self, state, ghost, moves):
+        """
+            Returns the probability of each move of ghost `ghost` in state at a chance node, uniform by default.
+        """
+        return [1. / len(moves)] * len(moves)
+
+    def enter_node(self, state, current, food, visited, current_depth, alpha, beta, ghost):
+        """
+            Starts the search of a node (MAX if ghost is 0, MIN or chance node of ghost `ghost` otherwise).
+            avoids cycles by checking actions_taken dictionary
+            current is the zobrist key of state and food its remaining food dots, both updated incrementally
+            from the parent ones
+            NOTE:
+                With chance nodes, the value of a state does not depend on the path leading to it: states on
+                the search path or of a previous move are searched again and transpositions are reused at
+                any cut-off depth.
+
+            Return:
+            -------
+            (value, None) when the value of the node is known without searching its successors (cut-off state,
+            state on the search path, state of a previous move or, see memoized, visited state or transposition),
+            (None, frame) otherwise, frame holding the moves of the node to search
+        """
+        if self.cutoff_test(state, current_depth):
+            return self.evaluate(state, current, food), None
+        elif self.chance_nodes:
+            pass
+        elif current in visited:
+            if self.stats is not None:
+                self.stats.visited_hits += 1
+            return visited[current], None
+        elif current in self.actions_taken:
+            if self.stats is not None:
+                self.stats.actions_taken_hits += 1
+            return float('inf') if ghost else float('-inf'), None
+
+        remaining_depth = self.remaining_depth(current_depth)
+        if self.memoized() or self.chance_nodes:
+            score = state.getScore()
+            stored = self.transpositions.probe(self.zobrist.node_key(current, ghost), remaining_depth,
+                                               alpha - score, beta - score)
+            if stored is not None:
+                if self.stats is not None:
+                    self.stats.transposition_hits += 1
+                if stored[1]:
+                    self.depth_cut = True
+                return stored[0] + score, None
+
+        if self.stats is not None:
+            self.stats.node(current_depth)
+        moves, keys, foods, order = self.expand(state, current, food, current_depth, ghost)
+        if ghost and self.chance_nodes:
+            value = 0.
+            probabilities = self.ghost_probabilities(state, ghost, moves)
+        else:
+            value = float('inf') if ghost else float('-inf')
+            probabilities = None
+            visited[current] = value
+        frame = SearchFrame(current, food, current_depth, ghost, alpha, beta, value, remaining_depth,
+                            moves, keys, foods, order, probabilities)
+        frame.outer_cut = self.depth_cut
+        self.depth_cut = False
+        return None, frame
+
+    def leave_node(self, frame, visited, state):
+        """
+            Ends the search of the node of frame (state is the searched state) and returns its value.
+            the node is removed from the search path, when values are memoized (see memoized) exact values
+            (not cut by alpha or beta) are kept in visited, all values are kept in the transposition table with
+            their bound type and reused by searches at most as deep
+            the expectation of a chance node is exact unless star1 pruning cut it (see child_window)
+            NOTE:
+                Transposition entries hold the value minus the score of the state, as the evaluation cache,
+                since the score is not part of the key, and whether the search of the node reached the cut-off
+                depth, so that a transposition hit tells iterative deepening that the tree was cut.
+        """
+        value = frame.value
+        if frame.ghost == 0:
+            exact = value < frame.beta and (frame.initial_bound < value or frame.initial_bound == float('-inf'))
+            bound = LOWER if value >= frame.beta else UPPER
+        elif frame.probabilities is None:
+            exact = value > frame.alpha and (value < frame.initial_bound or frame.initial_bound == float('inf'))
+            bound = UPPER if value <= frame.alpha else LOWER
+        else:
+            exact = self.value_bounds is None or frame.alpha < value < frame.beta
+            bound = UPPER if value <= frame.alpha else LOWER
+        if self.chance_nodes:
+            pass
+        elif exact and self.memoized():
+            visited[frame.current] = value
+        else:
+            del visited[frame.current]
+        cut = self.depth_cut
+        self.depth_cut = frame.outer_cut or cut
+        self.transpositions.store(self.zobrist.node_key(frame.current, frame.ghost), frame.remaining_depth,
+                                  value - state.getScore(), EXACT if exact else bound, cut, frame.best)
+        return value
+
+
+class SearchFrame:
+    """
+        A node being searched by SearchAgent.search_value: its key, food dots, depth, player (0 for Pacman,
+        the ghost index otherwise), alpha-beta window and value so far, the move reaching this value, the
+        alpha (MAX) or beta (MIN) bound it was entered with, its moves with the keys and food dots of the
+        states they lead to, the order in which they are searched, the position of the next one in this
+        order, the record of the move leading to the node (None for the node the search started from) and
+        whether the search had reached the cut-off depth before entering the node.
+        Chance nodes also hold the probabilities of their moves (None for MAX and MIN nodes) and the
+        probability of the moves not searched yet, their value so far is the partial expectation.
+    """
+    __slots__ = ('current', 'food', 'depth', 'ghost', 'alpha', 'beta', 'initial_bound', 'value', 'best',
+                 'remaining_depth', 'moves', 'keys', 'foods', 'order', 'position', 'record', 'outer_cut',
+                 'probabilities', 'remaining')
+
+    def __init__(self, current, food, depth, ghost, alpha, beta, value, remaining_depth, moves, keys, foods,
+                 order, probabilities=None):
+        self.current = current
+        self.food = food
+        self.depth = depth
+        self.ghost = ghost
+        self.alpha = alpha
+        self.beta = beta
+        self.initial_bound = beta if ghost else alpha
+        self.value = value
+        self.best = None
+        self.remaining_depth = remaining_depth
+        self.moves = moves
+        self.keys = keys
+        self.foods = foods
+        self.order = order
+        self.position = 0
+        self.record = None
+        self.outer_cut = False
+        self.probabilities = probabilities
+        self.remaining = 1.
@@ -0,0 +1,354 @@
+"""
+States searched by 'SearchAgent', moved forward and back with make/unmake
+instead of building a new 'GameState' per node.
+
+SearchState is a compact mutable state (positions, food bitmask, score)
+following the rules of the game engine. EngineState wraps the engine
+'GameState' objects behind the same interface, it is used when the rules
+of SearchState do not reproduce the engine at the root of the search
+(see 'make_search_state').
+"""
+
+from pacman_module.pacman import Directions
+
+from adjacency import MoveAdjacency
+
+# moves in the order of the engine legal actions
+MOVES = [
+    (Directions.NORTH, 0, 1),
+    (Directions.SOUTH, 0, -1),
+    (Directions.EAST, 1, 0),
+    (Directions.WEST, -1, 0),
+    (Directions.STOP, 0, 0),
+]
+
+MOVE_VECTORS = {action: (dx, dy) for action, dx, dy in MOVES}
+
+REVERSE = {
+    Directions.NORTH: Directions.SOUTH,
+    Directions.SOUTH: Directions.NORTH,
+    Directions.EAST: Directions.WEST,
+    Directions.WEST: Directions.EAST,
+    Directions.STOP: Directions.STOP,
+}
+
+TIME_PENALTY = 1
+FOOD_SCORE = 10
+WIN_SCORE = 500
+LOSE_SCORE = 500
+
+
+class SearchRules:
+    def __init__(self, walls, pacman_stop=True, ghost_reverse=None):
+        """
+        Static rules of a layout shared by the SearchState of a game.
+
+        Arguments:
+        ----------
+        - `walls`: the grid of walls of the layout (`state.getWalls()`)
+        - `pacman_stop`: whether STOP is a legal action of Pacman
+        - `ghost_reverse`: whether ghosts may reverse their direction when
+          they have another legal action, None while it is unknown
+
+        NOTE:
+            The legal moves of every open cell are read once from the
+            adjacency index of the layout (see adjacency.py).
+        """
+        self.adjacency = MoveAdjacency(walls)
+        self.height = walls.height
+        self.pacman_stop = pacman_stop
+        self.ghost_reverse = ghost_reverse
+        self.moves = {position: [action for action, next_position in self.adjacency.moves(cell)]
+                      for cell, position in enumerate(self.adjacency.positions)}
+
+    def legal_moves(self, position, stop):
+        if stop:
+            return self.moves[position] + [Directions.STOP]
+        return list(self.moves[position])
+
+
+class SearchState:
+    __slots__ = ('rules', 'pacman', 'ghosts', 'directions', 'food', 'n_food', 'score', 'win', 'lose')
+
+    def __init__(self, rules, pacman, ghosts, directions, food, n_food, score, win=False, lose=False):
+        """
+        Compact game state: Pacman position, ghost positions and
+        directions, remaining food as a bitmask of the cells
+        x * height + y, score and WIN/LOSE flags.
+
+        NOTE:
+            Implements the GameState methods read by the search and the
+            evaluators (getPacmanPosition, getScore, isWin, ...).
+            make(agent, action) plays a move in place and returns the
+            record that unmake(record) uses to play it back, the record
+            starts with (agent, previous position, food eaten).
+        """
+        self.rules = rules
+        self.pacman = pacman
+        self.ghosts = ghosts
+        self.directions = directions
+        self.food = food
+        self.n_food = n_food
+        self.score = score
+        self.win = win
+        self.lose = lose
+
+    @classmethod
+    def from_state(cls, state, rules):
+        height = rules.height
+        food = 0
+        food_list = state.getFood().asList()
+        for x, y in food_list:
+            food |= 1 << (int(x) * height + int(y))
+        ghosts = [(int(x), int(y)) for x, y in state.getGhostPositions()]
+        if hasattr(state, 'getGhostState'):
+            directions = [state.getGhostState(ghost).getDirection() for ghost in range(1, len(ghosts) + 1)]
+        else:
+            directions = [Directions.STOP] * len(ghosts)
+        x, y = state.getPacmanPosition()
+        return cls(rules, (int(x), int(y)), ghosts, directions, food, len(food_list), state.getScore(),
+                   state.isWin(), state.isLose())
+
+    def copy(self):
+        return SearchState(self.rules, self.pacman, list(self.ghosts), list(self.directions), self.food,
+                           self.n_food, self.score, self.win, self.lose)
+
+    def legal_moves(self, agent):
+        """
+        Return:
+        -------
+        - The legal actions of `agent` (0 for Pacman), none in WIN/LOSE
+          states.
+        """
+        if self.win or self.lose:
+            return []
+        if agent == 0:
+            return self.rules.legal_moves(self.pacman, self.rules.pacman_stop)
+        actions = self.rules.legal_moves(self.ghosts[agent - 1], False)
+        reverse = REVERSE[self.directions[agent - 1]]
+        if not self.rules.ghost_reverse and reverse in actions and len(actions) > 1:
+            actions.remove(reverse)
+        return actions
+
+    def make(self, agent, action):
+        """
+        Plays `action` of `agent` (0 for Pacman), None leaves the state
+        unchanged (a ghost that stays still).
+
+        Return:
+        -------
+        - The record of the move for unmake.
+        """
+        if agent == 0:
+            position = self.pacman
+        else:
+            position = self.ghosts[agent - 1]
+        if action is None:
+            return agent, position, False, None
+        record = (agent, position, False, (self.score, self.win, self.lose,
+                                           self.directions[agent - 1] if agent else None))
+        dx, dy = MOVE_VECTORS[action]
+        next_position = (position[0] + dx, position[1] + dy)
+
+        if agent == 0:
+            self.pacman = next_position
+            bit = 1 << (next_position[0] * self.rules.height + next_position[1])
+            if self.food & bit:
+                record = (agent, position, True, record[3])
+                self.food ^= bit
+                self.n_food -= 1
+                self.score += FOOD_SCORE
+                if self.n_food == 0 and not self.lose:
+                    self.score += WIN_SCORE
+                    self.win = True
+            self.score -= TIME_PENALTY
+            for ghost_position in self.ghosts:
+                if ghost_position == next_position and not self.win:
+                    self.score -= LOSE_SCORE
+                    self.lose = True
+        else:
+            self.ghosts[agent - 1] = next_position
+            self.directions[agent - 1] = action
+            if next_position == self.pacman and not self.win:
+                self.score -= LOSE_SCORE
+                self.lose = True
+        return record
+
+    def unmake(self, record):
+        agent, position, eaten, previous = record
+        if previous is None:
+            return
+        self.score, self.win, self.lose, direction = previous
+        if agent == 0:
+            if eaten:
+                self.food |= 1 << (self.pacman[0] * self.rules.height + self.pacman[1])
+                self.n_food += 1
+            self.pacman = position
+        else:
+            self.ghosts[agent - 1] = position
+            self.directions[agent - 1] = direction
+
+    def getNumAgents(self):
+        return len(self.ghosts) + 1
+
+    def getPacmanPosition(self):
+        return self.pacman
+
+    def getGhostPositions(self):
+        return self.ghosts
+
+    def getGhostPosition(self, ghost):
+        return self.ghosts[ghost - 1]
+
+    def hasFood(self, x, y):
+        return bool(self.food >> (int(x) * self.rules.height + int(y)) & 1)
+
+    def getScore(self):
+        return self.score
+
+    def isWin(self):
+        return self.win
+
+    def isLose(self):
+        return self.lose
+
+
+class EngineState:
+    __slots__ = ('states', 'successors')
+
+    def __init__(self, state):
+        """
+        Stack of engine GameState objects with the interface of
+        SearchState: make pushes the successor generated by the engine,
+        unmake pops it.
+        """
+        self.states = [state]
+        # successors generated at each level of the stack by legal_moves
+        self.successors = [None]
+
+    def copy(self):
+        return EngineState(self.states[-1])
+
+    def legal_moves(self, agent):
+        state = self.states[-1]
+        if agent == 0:
+            successors = state.generatePacmanSuccessors()
+        else:
+            successors = state.generateGhostSuccessors(agent)
+        self.successors[-1] = {action: next_state for next_state, action in successors}
+        return [action for next_state, action in successors]
+
+    def make(self, agent, action):
+        state = self.states[-1]
+        if action is None:
+            next_state = state
+        elif self.successors[-1] is not None and action in self.successors[-1]:
+            next_state = self.successors[-1][action]
+        else:
+            next_state = state.generateSuccessor(agent, action)
+        if agent == 0:
+            position = state.getPacmanPosition()
+            next_position = next_state.getPacmanPosition()
+            eaten = action is not None and state.hasFood(int(next_position[0]), int(next_position[1]))
+        else:
+            position = state.getGhostPosition(agent)
+            eaten = False
+        self.states.append(next_state)
+        self.successors.append(None)
+        return agent, position, eaten, None
+
+    def unmake(self, record):
+        self.states.pop()
+        self.successors.pop()
+
+    def getNumAgents(self):
+        return self.states[-1].getNumAgents()
+
+    def getPacmanPosition(self):
+        return self.states[-1].getPacmanPosition()
+
+    def getGhostPositions(self):
+        return self.states[-1].getGhostPositions()
+
+    def getGhostPosition(self, ghost):
+        return self.states[-1].getGhostPosition(ghost)
+
+    def hasFood(self, x, y):
+        return self.states[-1].hasFood(x, y)
+
+    def getScore(self):
+        return self.states[-1].getScore()
+
+    def isWin(self):
+        return self.states[-1].isWin()
+
+    def isLose(self):
+        return self.states[-1].isLose()
+
+
+def _same_successors(search_state, successors, agent):
+    """
+    Whether the moves of `agent` from `search_state` lead to the same
+    actions (in the same order), positions, scores and WIN/LOSE flags as
+    the `successors` generated by the engine.
+    """
+    actions = search_state.legal_moves(agent)
+    if actions != [action for next_state, action in successors]:
+        return False
+    for action, (next_state, _) in zip(actions, successors):
+        record = search_state.make(agent, action)
+        same = (search_state.getPacmanPosition() == next_state.getPacmanPosition()
+                and list(search_state.getGhostPositions()) == list(next_state.getGhostPositions())
+                and search_state.getScore() == next_state.getScore()
+                and search_state.isWin() == next_state.isWin()
+                and search_state.isLose() == next_state.isLose())
+        search_state.unmake(record)
+        if not same:
+            return False
+    return True
+
+
+def make_search_state(state, rules):
+    """
+    Returns the state searched from the engine `state`: a SearchState when
+    its rules reproduce the successors of `state` generated by the engine
+    for every agent, an EngineState otherwise (capsules and scared ghosts
+    are left to the engine).
+
+    NOTE:
+        Whether Pacman may stop is read from the engine successors, whether
+        ghosts may reverse is chosen among the two rules by the successors
+        of every ghost (the known rule is kept if both match). While no
+        state told the two rules apart (ghosts that did not move yet have
+        no direction to reverse), the engine is searched. `rules` is
+        updated accordingly.
+    """
+    if getattr(state, 'getCapsules', None) is not None and state.getCapsules():
+        return EngineState(state)
+    if any(int(x) != x or int(y) != y for x, y in state.getGhostPositions()):
+        return EngineState(state)
+
+    known = rules.ghost_reverse
+    successors = state.generatePacmanSuccessors()
+    rules.pacman_stop = Directions.STOP in [action for next_state, action in successors]
+    search_state = SearchState.from_state(state, rules)
+    if not _same_successors(search_state, successors, 0):
+        return EngineState(state)
+
+    matching = [False, True]
+    for ghost in range(1, state.getNumAgents()):
+        successors = state.generateGhostSuccessors(ghost)
+        for ghost_reverse in list(matching):
+            rules.ghost_reverse = ghost_reverse
+            if not _same_successors(search_state, successors, ghost):
+                matching.remove(ghost_reverse)
+    if state.getNumAgents() == 1:
+        matching = [False]
+    if known in matching:
+        rules.ghost_reverse = known
+    elif len(matching) == 1:
+        rules.ghost_reverse = matching[0]
+    else:
+        rules.ghost_reverse = None
+        return EngineState(state)
+    return search_state
@@ -0,0 +1,145 @@
+import json
+import math
+import time
+
+
+class SearchStats:
+    def __init__(self, path=None):
+        """
+        Statistics of the searches of a PacmanAgent, recorded move by move:
+        nodes expanded per depth, eval calls, visited, transposition and
+        actions_taken hits, moves searched first from the transposition
+        table, alpha-beta cutoffs, effective branching factor and wall time
+        of each phase of the move.
+
+        NOTE:
+            Agents hold None instead of a SearchStats when statistics are
+            disabled and only test it at each hook, so that the search pays
+            nothing more than this test.
+
+        Arguments:
+        ----------
+        - `path`: JSON lines file receiving the record of every move,
+          None to keep the records in memory only (see `moves`)
+        """
+        self.path = path
+        self.moves = []
+        self.start_move()
+
+    def start_move(self):
+        """
+        Resets the counters at the start of the search of a move.
+        """
+        self.nodes = []
+        self.evals = 0
+        self.visited_hits = 0
+        self.transposition_hits = 0
+        self.transposition_move_hits = 0
+        self.actions_taken_hits = 0
+        self.cutoffs = 0
+        self.phases = dict()
+        self._start = time.perf_counter()
+        self._lap = self._start
+
+    def node(self, depth):
+        """
+        Counts a node expanded at `depth` (0 for the root).
+        """
+        while len(self.nodes) <= depth:
+            self.nodes.append(0)
+        self.nodes[depth] += 1
+
+    def lap(self, phase):
+        """
+        Adds the wall time since the previous lap (or the start of the
+        move) to the time of `phase`.
+        """
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.) + now - self._lap
+        self._lap = now
+
+    def effective_branching_factor(self):
+        """
+        Return:
+        -------
+        - The branching factor b of the uniform tree of the same depth d
+          and number of nodes N as the search: N = 1 + b + ... + b ** d.
+
+        NOTE:
+            b is found by bisection on log(1 + b + ... + b ** d) (see
+            `log_tree_size`), between 0 and N ** (1 / d), so that deep
+            searches (minimax reaches hundreds of plies) do not overflow.
+        """
+        depth = len(self.nodes) - 1
+        total = sum(self.nodes)
+        if depth <= 0:
+            return 0.
+        log_total = math.log(total)
+        low, high = 0., math.exp(log_total / depth)
+        for _ in range(64):
+            b = (low + high) / 2
+            if log_tree_size(b, depth) < log_total:
+                low = b
+            else:
+                high = b
+        return (low + high) / 2
+
+    def end_move(self, action):
+        """
+        Records the statistics of the move which chose `action`, appended
+        to `moves` and written to the JSON lines file if any.
+
+        Return:
+        -------
+        - The record of the move as a dictionary.
+        """
+        record = {
+            "move": len(self.moves),
+            "action": str(action),
+            "nodes": list(self.nodes),
+            "evals": self.evals,
+            "visited_hits": self.visited_hits,
+            "transposition_hits": self.transposition_hits,
+            "transposition_move_hits": self.transposition_move_hits,
+            "actions_taken_hits": self.actions_taken_hits,
+            "cutoffs": self.cutoffs,
+            "effective_branching_factor": self.effective_branching_factor(),
+            "phases": dict(self.phases),
+            "time": time.perf_counter() - self._start,
+        }
+        self.moves.append(record)
+        if self.path is not None:
+            with open(self.path, "a") as records:
+                records.write(json.dumps(record) + "\n")
+        return record
+
+
+def log_tree_size(b, depth):
+    """
+    Return:
+    -------
+    - log(1 + b + ... + b ** depth), computed without b ** depth for b > 1.
+    """
+    if b == 0:
+        return 0.
+    if b == 1:
+        return math.log(depth + 1)
+    log_b = math.log(b)
+    if b > 1:
+        # (b ** (depth + 1) - 1) / (b - 1) = b ** (depth + 1) * (1 - b ** -(depth + 1)) / (b - 1)
+        return (depth + 1) * log_b + math.log(-math.expm1(-(depth + 1) * log_b)) - math.log(b - 1)
+    return math.log(-math.expm1((depth + 1) * log_b)) - math.log1p(-b)
+
+
+def make_search_stats(args):
+    """
+    Return:
+    -------
+    - The SearchStats of an agent built with the command line `args`:
+      written to the 'statspath' file if given, kept in memory with
+      'searchstats', None (disabled) otherwise.
+    """
+    path = getattr(args, 'statspath', None)
+    if path is None and not getattr(args, 'searchstats', False):
+        return None
+    return SearchStats(path)
@@ -0,0 +1,399 @@
+"""
+Endgame tablebase of the search agents: for every position of a layout with
+one ghost and at most K food dots left, the number of Pacman moves in which
+Pacman is sure to eat every dot (distance to win) whatever the ghost plays,
+computed offline by retrograde analysis:
+
+    python tablebase.py <layout> --max-food 2 --output <layout>_endgame
+
+The table is written to `<output>.npy` (a [positions, pacman cell, ghost
+cell, ghost direction] uint16 array, memory-mapped when probed) with its
+header in `<output>.json`. Agents given the prefix as 'tablebase' argument
+probe it before searching (see SearchAgent.get_action).
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import os
+
+import numpy as np
+
+from adjacency import DIRECTIONS, MoveAdjacency
+from search_state import FOOD_SCORE, TIME_PENALTY, WIN_SCORE, SearchState
+
+# distance to win of the positions Pacman cannot win whatever he plays
+NO_WIN = int(np.iinfo(np.uint16).max)
+
+# index of the STOP move (Pacman) and of the direction of a ghost that did not move yet
+STOP = len(DIRECTIONS)
+REVERSE = [1, 0, 3, 2, STOP]
+MOVE_INDEX = {action: index for index, action in enumerate(DIRECTIONS)}
+
+
+def layout_digest(adjacency):
+    """
+    Returns a digest of the walls of a layout, from its MoveAdjacency.
+    """
+    cells = np.ascontiguousarray(adjacency.index >= 0)
+    return hashlib.sha1("{}x{}".format(adjacency.width, adjacency.height).encode() + cells.tobytes()).hexdigest()
+
+
+def subset_rank(indices):
+    """
+    Returns the rank of a set of food dots (sorted food indices) among the
+    sets of the same size (combinatorial number system).
+    """
+    return sum(math.comb(index, size + 1) for size, index in enumerate(indices))
+
+
+def subset_ranks(sets):
+    """
+    Returns the subset_rank of every row of a [n_sets, size] array of sets.
+    """
+    ranks = np.zeros(len(sets), dtype=np.int64)
+    for size in range(sets.shape[1]):
+        ranks += np.array([math.comb(int(index), size + 1) for index in sets[:, size]], dtype=np.int64)
+    return ranks
+
+
+def move_tables(adjacency, pacman_stop, ghost_reverse):
+    """
+    Moves of the agents between the open cells of a layout.
+
+    Return:
+    -------
+    - `pacman_next`: [n_cells, 5] open cell reached by each Pacman move (in
+      the order of DIRECTIONS then STOP), -1 for the illegal ones
+    - `ghost_next`, `ghost_direction`: [n_cells, n_directions, 4] open cell
+      reached by each ghost move and the direction of the ghost after it,
+      depending on the direction of the ghost before it (a single direction
+      when ghosts may reverse), cell -1 for the illegal ones
+    """
+    n_cells = len(adjacency.positions)
+    pacman_next = np.full((n_cells, STOP + 1), -1, dtype=np.int64)
+    pacman_next[adjacency.sources, adjacency.directions] = adjacency.neighbours
+    if pacman_stop:
+        pacman_next[:, STOP] = np.arange(n_cells)
+
+    n_directions = 1 if ghost_reverse else STOP + 1
+    ghost_next = np.repeat(pacman_next[:, None, :STOP], n_directions, axis=1)
+    ghost_direction = np.zeros_like(ghost_next)
+    if not ghost_reverse:
+        ghost_direction[:] = np.arange(STOP)
+        # a ghost reverses its direction only when it has no other move
+        other_moves = (pacman_next[:, :STOP] >= 0).sum(axis=1) > 1
+        for direction in range(STOP):
+            ghost_next[other_moves, direction, REVERSE[direction]] = -1
+    return pacman_next, ghost_next, ghost_direction
+
+
+def ghost_turn(table, ghost_next, ghost_direction):
+    """
+    Arguments:
+    ----------
+    - `table`: [n_sets, pacman cell, ghost cell, ghost direction] distances
+      to win of positions where Pacman is to move
+
+    Return:
+    -------
+    - The distances to win of the same positions with the ghost to move,
+      the ghost playing the move that delays the win most (catching Pacman
+      if it can).
+    """
+    n_cells = table.shape[1]
+    pacman = np.arange(n_cells)[:, None, None]
+    value = np.full(table.shape, -1, dtype=np.int32)
+    for move in range(ghost_next.shape[2]):
+        cells = ghost_next[:, :, move]
+        legal = cells >= 0
+        move_value = table[:, :, np.where(legal, cells, 0), ghost_direction[:, :, move]].astype(np.int32)
+        move_value[:, cells[None] == pacman] = NO_WIN
+        move_value[:, :, ~legal] = -1
+        np.maximum(value, move_value, out=value)
+    # a ghost without legal move stays still
+    return np.where(value < 0, table, value)
+
+
+def solve_sets(after_eat, previous_turn, pacman_next, ghost_next, ghost_direction):
+    """
+    Distances to win of the positions of a few sets of food dots of the same
+    size, by iterating the minimax recurrence from 'no win' until it does not
+    change anymore.
+
+    Arguments:
+    ----------
+    - `after_eat`: [n_sets, n_cells] index of the set left once the dot of a
+      cell is eaten (among the sets of one dot less), -1 for cells without dot
+    - `previous_turn`: ghost_turn of the sets of one dot less, None when
+      these sets have a single dot (eating it wins)
+
+    Return:
+    -------
+    - The [n_sets, pacman cell, ghost cell, ghost direction] uint16 table.
+    """
+    n_sets, n_cells = after_eat.shape
+    caught = np.eye(n_cells, dtype=bool)
+    shape = (n_sets, n_cells, n_cells, ghost_next.shape[1])
+
+    # moves of each Pacman cell and values of the moves eating a dot, which
+    # lead to the sets of one dot less and do not change during the iteration
+    moves = []
+    for move in range(pacman_next.shape[1]):
+        cells = pacman_next[:, move]
+        legal = cells >= 0
+        if not legal.any():
+            continue
+        cells = np.where(legal, cells, 0)
+        eats = (after_eat[:, cells] >= 0) & legal
+        if previous_turn is None:
+            eat_value = np.zeros(shape, dtype=np.int32)
+        else:
+            eat_value = previous_turn[np.maximum(after_eat[:, cells], 0), cells].astype(np.int32)
+            eat_value[:, caught[cells]] = NO_WIN
+        moves.append((cells, legal, eats, eat_value))
+
+    value = np.full(shape, NO_WIN, dtype=np.int32)
+    while True:
+        turn = ghost_turn(value, ghost_next, ghost_direction)
+        best = np.full(shape, NO_WIN, dtype=np.int32)
+        for cells, legal, eats, eat_value in moves:
+            move_value = turn[:, cells]
+            move_value[:, caught[cells]] = NO_WIN
+            move_value = np.where(eats[:, :, None, None], eat_value, move_value)
+            move_value[:, ~legal] = NO_WIN
+            np.minimum(best, move_value, out=best)
+        next_value = np.minimum(best + 1, NO_WIN)
+        next_value[:, caught] = NO_WIN
+        if np.array_equal(next_value, value):
+            return value.astype(np.uint16)
+        value = next_value
+
+
+def build_tablebase(walls, food, max_food, output, pacman_stop=True, ghost_reverse=False, chunk_size=2 ** 22):
+    """
+    Computes the tablebase of a layout and writes it to `output`.npy and
+    `output`.json.
+
+    NOTE:
+        Sets of k dots only lead to themselves (Pacman does not eat) or to
+        sets of k - 1 dots (Pacman eats), so they are solved by increasing
+        size, a few sets at a time. Positions are only stored with Pacman to
+        move, the positions with the ghost to move are recomputed from them.
+
+    Arguments:
+    ----------
+    - `walls`: the grid of walls of the layout
+    - `food`: positions of the food dots of the layout
+    - `max_food`: largest number of dots left of the stored positions
+    - `output`: path of the files without extension
+    - `pacman_stop`, `ghost_reverse`: rules of the game (see
+      search_state.SearchRules)
+    - `chunk_size`: number of positions solved at a time
+    """
+    adjacency = MoveAdjacency(walls)
+    pacman_next, ghost_next, ghost_direction = move_tables(adjacency, pacman_stop, ghost_reverse)
+    n_cells = len(adjacency.positions)
+    food = sorted((int(x), int(y)) for x, y in food)
+    food_cells = np.array([adjacency.cell(position) for position in food], dtype=np.int64)
+    max_food = min(max_food, len(food))
+    sizes = [math.comb(len(food), size) for size in range(max_food + 1)]
+    cell_shape = (n_cells, n_cells, ghost_next.shape[1])
+
+    table = np.lib.format.open_memmap(output + ".npy", mode="w+", dtype=np.uint16,
+                                      shape=(sum(sizes),) + cell_shape)
+    table[0] = 0
+    previous_turn = None
+    start = 1
+    for size in range(1, max_food + 1):
+        # sets of `size` dots in rank order, and the rank of each set without one of its dots
+        sets = np.array(list(itertools.combinations(range(len(food)), size)), dtype=np.int64)
+        sets = sets[np.argsort(subset_ranks(sets))]
+        after_eat = np.full((sizes[size], n_cells), -1, dtype=np.int64)
+        for removed in range(size):
+            after_eat[np.arange(sizes[size]), food_cells[sets[:, removed]]] = subset_ranks(np.delete(sets, removed,
+                                                                                                     axis=1))
+
+        level = np.empty((sizes[size],) + cell_shape, dtype=np.uint16)
+        n_sets = max(1, chunk_size // int(np.prod(cell_shape)))
+        for first in range(0, sizes[size], n_sets):
+            level[first:first + n_sets] = solve_sets(after_eat[first:first + n_sets], previous_turn, pacman_next,
+                                                     ghost_next, ghost_direction)
+        table[start:start + sizes[size]] = level
+        start += sizes[size]
+        previous_turn = np.concatenate([ghost_turn(level[first:first + n_sets], ghost_next, ghost_direction)
+                                        .astype(np.uint16) for first in range(0, sizes[size], n_sets)])
+    table.flush()
+
+    header = {
+        "layout": layout_digest(adjacency),
+        "food": food,
+        "max_food": max_food,
+        "pacman_stop": pacman_stop,
+        "ghost_reverse": ghost_reverse,
+        "shape": list(table.shape),
+    }
+    with open(output + ".json", "w") as file:
+        json.dump(header, file)
+
+
+class Tablebase:
+    def __init__(self, path):
+        """
+        Endgame tablebase written by build_tablebase, memory-mapped.
+
+        Arguments:
+        ----------
+        - `path`: path of the files without extension
+        """
+        self.path = path
+        with open(path + ".json") as file:
+            header = json.load(file)
+        self.layout = header["layout"]
+        self.food = [tuple(position) for position in header["food"]]
+        self.food_index = {position: index for index, position in enumerate(self.food)}
+        self.max_food = header["max_food"]
+        self.pacman_stop = header["pacman_stop"]
+        self.ghost_reverse = header["ghost_reverse"]
+        self.table = np.load(path + ".npy", mmap_mode="r")
+        # first row of the sets of each size
+        self.starts = np.cumsum([0] + [math.comb(len(self.food), size) for size in range(self.max_food)]).tolist()
+        # adjacency of the layout of the probed states and the move tables built from it
+        self.adjacency = None
+        self.moves = None
+
+    def __getstate__(self):
+        # worker processes reopen the file instead of receiving a copy of the table
+        return self.path
+
+    def __setstate__(self, path):
+        self.__init__(path)
+
+    def probe(self, state):
+        """
+        Arguments:
+        ----------
+        - `state`: the state searched from the current game state (see
+          search_state.make_search_state)
+
+        Return:
+        -------
+        - (value, action): the score reached when Pacman plays `action` and
+          then wins as fast as he can whatever the ghost plays, or None when
+          the position is not in the table or cannot be won for sure.
+        """
+        if not isinstance(state, SearchState) or len(state.ghosts) != 1 or state.win or state.lose:
+            return None
+        rules = state.rules
+        if rules.pacman_stop != self.pacman_stop or rules.ghost_reverse != self.ghost_reverse:
+            return None
+        if self.adjacency is not rules.adjacency:
+            self.adjacency = rules.adjacency
+            self.moves = None
+            if layout_digest(rules.adjacency) == self.layout:
+                self.moves = move_tables(rules.adjacency, self.pacman_stop, self.ghost_reverse)
+        if self.moves is None or not 1 <= state.n_food <= self.max_food:
+            return None
+
+        adjacency = self.adjacency
+        indices = [index for index, (x, y) in enumerate(self.food) if state.hasFood(x, y)]
+        if len(indices) != state.n_food:
+            return None
+        pacman = adjacency.cell(state.pacman)
+        ghost = adjacency.cell(state.ghosts[0])
+        direction = 0 if self.ghost_reverse else MOVE_INDEX.get(state.directions[0], STOP)
+        row = self.starts[len(indices)] + subset_rank(indices)
+
+        pacman_next = self.moves[0]
+        best, best_action = NO_WIN, None
+        for action in state.legal_moves(0):
+            cell = int(pacman_next[pacman, MOVE_INDEX.get(action, STOP)])
+            eaten = self.food_index.get(adjacency.positions[cell])
+            if eaten in indices:
+                if len(indices) == 1:
+                    value = 0
+                elif cell == ghost:
+                    value = NO_WIN
+                else:
+                    rest = [index for index in indices if index != eaten]
+                    value = self.ghost_value(self.starts[len(rest)] + subset_rank(rest), cell, ghost, direction)
+            elif cell == ghost:
+                value = NO_WIN
+            else:
+                value = self.ghost_value(row, cell, ghost, direction)
+            if value < best:
+                best, best_action = value, action
+
+        if best == NO_WIN:
+            return None
+        distance = best + 1
+        return state.score + FOOD_SCORE * len(indices) + WIN_SCORE - TIME_PENALTY * distance, best_action
+
+    def ghost_value(self, row, pacman, ghost, direction):
+        """
+        Returns the distance to win of a position with the ghost to move (see ghost_turn).
+        """
+        pacman_next, ghost_next, ghost_direction = self.moves
+        value = -1
+        for move in range(ghost_next.shape[2]):
+            cell = int(ghost_next[ghost, direction, move])
+            if cell < 0:
+                continue
+            if cell == pacman:
+                return NO_WIN
+            value = max(value, int(self.table[row, pacman, cell, ghost_direction[ghost, direction, move]]))
+        if value < 0:
+            return int(self.table[row, pacman, ghost, direction])
+        return value
+
+
+def open_tablebase(args):
+    """
+    Returns the Tablebase of the 'tablebase' argument (path without
+    extension), None without it.
+    """
+    path = getattr(args, 'tablebase', None)
+    if path is None:
+        return None
+    return Tablebase(path)
+
+
+def load_layout(name):
+    """
+    Arguments:
+    ----------
+    - `name`: path of a '.lay' file, or name of a layout of
+      'pacman_module/layouts'
+
+    Return:
+    -------
+    - The `layout.Layout` of the file.
+    """
+    from pacman_module import layout
+    path = name
+    if not name.endswith(".lay"):
+        path = os.path.join(os.path.dirname(layout.__file__), "layouts", name + ".lay")
+    with open(path) as lines:
+        return layout.Layout([line.rstrip("\n") for line in lines if line.strip()])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("layout")
+    parser.add_argument("--max-food", type=int, default=2)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--no-stop", action="store_true", help="Pacman cannot stop")
+    parser.add_argument("--ghost-reverse", action="store_true", help="ghosts may reverse their direction")
+    args = parser.parse_args()
+
+    layout = load_layout(args.layout)
+    if layout.getNumGhosts() != 1:
+        parser.error("the tablebase is computed for layouts with a single ghost")
+    output = args.output or os.path.splitext(os.path.basename(args.layout))[0] + "_endgame"
+    build_tablebase(layout.walls, layout.food.asList(), args.max_food, output, not args.no_stop, args.ghost_reverse)
+
+
+if __name__ == "__main__":
+    main()
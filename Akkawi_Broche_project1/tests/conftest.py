@@ -0,0 +1,89 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# small layouts keeping the searches without pruning fast
+LAYOUTS = {
+    "corridors": [
+        "%%%%%%%%%%",
+        "%P . . .G%",
+        "%.%%.%%%.%",
+        "%. ..  . %",
+        "%.%%.%%%.%",
+        "%.  .   .%",
+        "%%%%%%%%%%",
+    ],
+    "two_ghosts": [
+        "%%%%%%%%%%",
+        "%P . . .G%",
+        "%.%%.%%%.%",
+        "%. ..  . %",
+        "%.%%.%%%.%",
+        "%G  .   .%",
+        "%%%%%%%%%%",
+    ],
+    "enclosed": [
+        "%%%%%%%%",
+        "%P..%. %",
+        "%.%.%%%%",
+        "%...G  %",
+        "%%%%%%%%",
+    ],
+    "two_dots": [
+        "%%%%%%%",
+        "%P. .G%",
+        "%.%%% %",
+        "%     %",
+        "%%%%%%%",
+    ],
+    "endgame": [
+        "%%%%%%%",
+        "%P...G%",
+        "%.%%%.%",
+        "%.....%",
+        "%%%%%%%",
+    ],
+}
+
+
+@pytest.fixture
+def new_state():
+    """
+    Returns a function giving the initial game state of a layout of LAYOUTS.
+    """
+    layout = pytest.importorskip("pacman_module.layout")
+    pacman = pytest.importorskip("pacman_module.pacman")
+
+    def new_state(name):
+        game_layout = layout.Layout(LAYOUTS[name])
+        state = pacman.GameState()
+        state.initialize(game_layout, game_layout.getNumGhosts())
+        return state
+
+    return new_state
+
+
+@pytest.fixture
+def play():
+    """
+    Returns a function playing a game from a state: Pacman plays the action
+    returned by `choose(state)`, ghosts play random legal actions drawn with
+    `seed`, until the game ends or `n_moves` Pacman moves were played.
+    """
+    def play(state, choose, seed=0, n_moves=20):
+        rng = random.Random(seed)
+        for _ in range(n_moves):
+            if state.isWin() or state.isLose():
+                break
+            state = state.generateSuccessor(0, choose(state))
+            for ghost in range(1, state.getNumAgents()):
+                if state.isWin() or state.isLose():
+                    break
+                state = state.generateSuccessor(ghost, rng.choice(state.getLegalActions(ghost)))
+        return state
+
+    return play
@@ -0,0 +1,50 @@
+from collections import deque
+
+import pytest
+
+pytest.importorskip("pacman_module")
+
+from distances import UNREACHABLE, MazeDistances  # noqa: E402
+from evaluators import get_evaluator  # noqa: E402
+from food import food_cells  # noqa: E402
+
+
+def breadth_first_distances(walls, start):
+    distances = {start: 0}
+    frontier = deque([start])
+    while frontier:
+        x, y = frontier.popleft()
+        for next_position in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if not walls[next_position[0]][next_position[1]] and next_position not in distances:
+                distances[next_position] = distances[(x, y)] + 1
+                frontier.append(next_position)
+    return distances
+
+
+def test_distances_match_breadth_first_search(new_state):
+    state = new_state("enclosed")
+    maze_distances = MazeDistances.from_state(state)
+    for start in maze_distances.positions:
+        expected = breadth_first_distances(state.getWalls(), start)
+        for end in maze_distances.positions:
+            assert maze_distances.distance(start, end) == expected.get(end, UNREACHABLE)
+
+
+@pytest.mark.parametrize("evaluator", ["nearest_food", "split_grid"])
+def test_unreachable_food_is_ignored(evaluator, new_state):
+    state = new_state("enclosed")
+    maze_distances = MazeDistances.from_state(state)
+    food = food_cells(state, maze_distances)
+    reachable = maze_distances.reachable(state.getPacmanPosition(), food)
+    assert 0 < len(reachable) < len(food)
+
+    evaluate = get_evaluator(evaluator)
+    value = evaluate(state, maze_distances, food)
+    assert value == evaluate(state, maze_distances, reachable)
+    assert abs(value - state.getScore()) < 100
+
+
+def test_nearest_distance_skips_unreachable_positions(new_state):
+    maze_distances = MazeDistances.from_state(new_state("enclosed"))
+    assert maze_distances.nearest_distance((1, 3), [(5, 3), (4, 1)]) == 5
+    assert maze_distances.nearest_distance((1, 3), [(5, 3)]) is None
@@ -0,0 +1,99 @@
+from argparse import Namespace
+
+import pytest
+
+pytest.importorskip("pacman_module")
+
+import expectimax  # noqa: E402
+from food import food_cells  # noqa: E402
+from search import SearchAgent  # noqa: E402
+
+
+class ClampedExpectimax(expectimax.PacmanAgent):
+    """
+    Expectimax with the evaluations clamped to `bounds` but without star1
+    pruning: the search that the pruned one must reproduce.
+    """
+
+    def __init__(self, args, bounds):
+        super().__init__(args)
+        self.bounds = bounds
+
+    def evaluate(self, state, current, food):
+        lower, upper = self.bounds
+        return min(max(SearchAgent.evaluate(self, state, current, food), lower), upper)
+
+
+def test_unknown_ghost_type_is_rejected():
+    with pytest.raises(ValueError):
+        expectimax.PacmanAgent(Namespace(ghostagent="angry"))
+
+
+@pytest.mark.parametrize("bounds", [(1., 1.), (2., -2.)])
+def test_empty_value_bounds_are_rejected(bounds):
+    with pytest.raises(ValueError):
+        expectimax.PacmanAgent(Namespace(valuebounds=bounds))
+
+
+@pytest.mark.parametrize("bounds", [(-1000., 1000.), (-20., 20.)])
+@pytest.mark.parametrize("ghost_type", ["scared", "confused"])
+def test_star1_pruning_keeps_the_expectimax_values(bounds, ghost_type, new_state, play):
+    pruned = expectimax.PacmanAgent(Namespace(valuebounds=bounds, ghostagent=ghost_type, ttsize=0,
+                                              searchstats=True))
+    reference = ClampedExpectimax(Namespace(ghostagent=ghost_type, ttsize=0), bounds)
+
+    def choose(state):
+        action = pruned.get_action(state)
+        expected = reference.get_action(state)
+        assert action == expected
+        return action
+
+    play(new_state("corridors"), choose, seed=3, n_moves=10)
+    assert sum(move["cutoffs"] for move in pruned.stats.moves) > 0
+
+
+def expectimax_value(agent, state, depth=0, ghost=0):
+    """
+    Recursive expectimax over the engine states, the search the chance
+    frames of SearchAgent.search_value must reproduce.
+    """
+    if state.isWin() or state.isLose() or depth == agent.max_depth:
+        return agent.evaluator(state, agent.maze_distances, food_cells(state, agent.maze_distances))
+    successors = [state.generateSuccessor(ghost, action) for action in state.getLegalActions(ghost)]
+    if ghost == 0:
+        return max(expectimax_value(agent, successor, depth + 1, 1) for successor in successors)
+
+    next_ghost, next_depth = ghost + 1, depth
+    if next_ghost == state.getNumAgents():
+        next_ghost, next_depth = 0, depth + 1
+    pacman_x, pacman_y = state.getPacmanPosition()
+
+    def distance(position):
+        return abs(position[0] - pacman_x) + abs(position[1] - pacman_y)
+
+    weights = [8. if distance(successor.getGhostPosition(ghost)) > distance(state.getGhostPosition(ghost)) else 1.
+               for successor in successors]
+    return sum(weight * expectimax_value(agent, successor, next_depth, next_ghost)
+               for weight, successor in zip(weights, successors)) / sum(weights)
+
+
+@pytest.mark.parametrize("name", ["corridors", "two_ghosts"])
+def test_chance_frames_match_recursive_expectimax(name, new_state, play):
+    agent = expectimax.PacmanAgent(Namespace(ghostagent="scared"))
+
+    def choose(state):
+        action = agent.get_action(state)
+        expected = expectimax_value(agent, state)
+        assert agent.actions_taken[agent.zobrist.key(state)] == pytest.approx(expected)
+        return action
+
+    play(new_state(name), choose, n_moves=3)
+
+
+def test_time_budget_deepens_the_expectimax_search(new_state):
+    agent = expectimax.PacmanAgent(Namespace(ghostagent="afraid", timebudget=0.2, searchstats=True))
+    state = new_state("two_dots")
+
+    assert agent.get_action(state) in state.getLegalActions(0)
+    assert agent.max_depth == 4
+    assert "depth_2" in agent.stats.moves[0]["phases"]
@@ -0,0 +1,81 @@
+import importlib
+from argparse import Namespace
+
+import pytest
+
+pytest.importorskip("pacman_module")
+
+from distances import MazeDistances  # noqa: E402
+from food import food_cells  # noqa: E402
+from search_state import SearchRules, make_search_state  # noqa: E402
+
+
+def unpruned_value(agent, state, current, food, path, depth, ghost):
+    """
+    Value of a node searched without pruning, with the cut-off, evaluation,
+    moves and keys of `agent`: the minimax search that alpha-beta must
+    reproduce.
+    """
+    if agent.cutoff_test(state, depth):
+        return agent.evaluate(state, current, food)
+    if current in path:
+        return path[current]
+    if current in agent.actions_taken:
+        return float('inf') if ghost else float('-inf')
+
+    value = float('inf') if ghost else float('-inf')
+    path[current] = value
+    moves, keys, foods, _ = agent.expand(state, current, food, depth, ghost)
+    for move, next_key, next_food in zip(moves, keys, foods):
+        record = state.make(ghost, move)
+        if ghost == 0:
+            child = unpruned_value(agent, state, next_key, next_food, path, depth + 1, 1)
+        elif ghost + 1 < state.getNumAgents():
+            child = unpruned_value(agent, state, next_key, food, path, depth, ghost + 1)
+        else:
+            child = unpruned_value(agent, state, next_key, food, path, depth + 1, 0)
+        state.unmake(record)
+        value = max(value, child) if ghost == 0 else min(value, child)
+    del path[current]
+    return value
+
+
+def unpruned_action(agent, state):
+    """
+    Returns the first generated root move of maximum value in the search
+    without pruning, and the values of the root moves.
+    """
+    if agent.zobrist is None:
+        agent.zobrist = agent.hasher.from_state(state)
+    if agent.rules is None:
+        agent.rules = SearchRules(state.getWalls())
+    if agent.maze_distances is None and agent.evaluator.needs_maze_distances:
+        agent.maze_distances = MazeDistances.from_state(state)
+
+    current = agent.zobrist.key(state)
+    food = food_cells(state, agent.maze_distances) if agent.maze_distances is not None else None
+    root = make_search_state(state, agent.rules)
+    moves, keys, foods, _ = agent.expand(root, current, food, 0, 0)
+    values = []
+    for move, next_key, next_food in zip(moves, keys, foods):
+        child = root.copy()
+        child.make(0, move)
+        values.append(unpruned_value(agent, child, next_key, next_food, dict(), 1, 1))
+    best = values.index(max(values))
+    return moves[best], dict(zip(moves, values))
+
+
+@pytest.mark.parametrize("agent_name", ["hminimax0", "hminimax1", "hminimax2"])
+@pytest.mark.parametrize("layout", ["corridors", "two_ghosts"])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_pruned_search_chooses_the_unpruned_action(agent_name, layout, seed, new_state, play):
+    agent = importlib.import_module(agent_name).PacmanAgent(Namespace())
+
+    def choose(state):
+        expected, values = unpruned_action(agent, state)
+        action = agent.get_action(state)
+        assert action == expected, values
+        return action
+
+    play(new_state(layout), choose, seed, n_moves=12)
+
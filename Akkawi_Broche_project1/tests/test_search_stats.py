@@ -0,0 +1,45 @@
+import importlib
+import math
+from argparse import Namespace
+
+import pytest
+
+from search_stats import SearchStats, log_tree_size
+
+
+@pytest.mark.parametrize("b", [0.25, 0.999, 1., 1.001, 2., 7.5])
+@pytest.mark.parametrize("depth", [1, 4, 30])
+def test_log_tree_size(b, depth):
+    assert log_tree_size(b, depth) == pytest.approx(math.log(sum(b ** d for d in range(depth + 1))))
+
+
+@pytest.mark.parametrize("nodes, expected", [
+    ([1], 0.),
+    ([1, 2], 2.),
+    ([1, 3, 9, 27], 3.),
+    ([1] * 420, 1.),
+])
+def test_effective_branching_factor(nodes, expected):
+    stats = SearchStats()
+    stats.nodes = nodes
+    assert stats.effective_branching_factor() == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("depth", [300, 500, 5000])
+def test_effective_branching_factor_of_deep_searches(depth):
+    stats = SearchStats()
+    stats.nodes = [1] + [4] * depth
+    b = stats.effective_branching_factor()
+    assert 1. < b < 1.01
+    assert log_tree_size(b, depth) == pytest.approx(math.log(sum(stats.nodes)))
+
+
+# full-tree minimax stays fast on the small endgame layout only
+@pytest.mark.parametrize("agent_name, layout", [("minimax", "endgame"), ("hminimax1", "corridors")])
+def test_search_statistics_are_recorded_every_move(agent_name, layout, new_state, play):
+    agent = importlib.import_module(agent_name).PacmanAgent(Namespace(searchstats=True))
+    play(new_state(layout), agent.get_action, n_moves=8)
+    assert len(agent.stats.moves) > 0
+    for move in agent.stats.moves:
+        assert math.isfinite(move["effective_branching_factor"])
+        assert sum(move["nodes"]) > 0
@@ -0,0 +1,119 @@
+import itertools
+from argparse import Namespace
+
+import pytest
+
+pytest.importorskip("pacman_module")
+
+import expectimax  # noqa: E402
+import hminimax1  # noqa: E402
+from adjacency import DIRECTIONS  # noqa: E402
+from search_state import FOOD_SCORE, WIN_SCORE, SearchRules, SearchState, make_search_state  # noqa: E402
+from tablebase import Tablebase, build_tablebase  # noqa: E402
+
+MAX_FOOD = 2
+
+
+@pytest.fixture
+def endgame(new_state, tmp_path):
+    """
+    Returns the initial state of the endgame layout, its search rules and
+    its tablebase.
+    """
+    state = new_state("endgame")
+    path = str(tmp_path / "endgame")
+    build_tablebase(state.getWalls(), state.getFood().asList(), MAX_FOOD, path)
+    return state, SearchRules(state.getWalls(), pacman_stop=True, ghost_reverse=False), Tablebase(path)
+
+
+def forced_win(state, moves, memo):
+    """
+    Whether Pacman (to move) is sure to win within `moves` moves whatever the
+    ghost plays, by exhaustive AND-OR search.
+    """
+    if moves == 0:
+        return False
+    key = (state.pacman, state.ghosts[0], state.directions[0], state.food, moves)
+    if key not in memo:
+        memo[key] = False
+        for action in state.legal_moves(0):
+            record = state.make(0, action)
+            win = state.win or (not state.lose and all(wins_after_ghost_move(state, move, moves - 1, memo)
+                                                       for move in state.legal_moves(1)))
+            state.unmake(record)
+            if win:
+                memo[key] = True
+                break
+    return memo[key]
+
+
+def wins_after_ghost_move(state, move, moves, memo):
+    """
+    Whether Pacman is sure to win within `moves` moves once the ghost played
+    `move`.
+    """
+    record = state.make(1, move)
+    win = not state.lose and forced_win(state, moves, memo)
+    state.unmake(record)
+    return win
+
+
+def positions(state, rules, n_food):
+    height = rules.height
+    food = state.getFood().asList()
+    cells = rules.adjacency.positions
+    for dots in itertools.combinations(food, n_food):
+        mask = sum(1 << (x * height + y) for x, y in dots)
+        for pacman, ghost in itertools.permutations(cells, 2):
+            for direction in DIRECTIONS:
+                yield SearchState(rules, pacman, [ghost], [direction], mask & ~(1 << (pacman[0] * height + pacman[1])),
+                                  n_food - (pacman in dots), 0)
+
+
+@pytest.mark.parametrize("n_food", range(1, MAX_FOOD + 1))
+def test_tablebase_matches_exhaustive_search(n_food, endgame):
+    state, rules, tablebase = endgame
+    memo = dict()
+    checked = 0
+    for position in positions(state, rules, n_food):
+        if position.n_food != n_food:
+            continue
+        probed = tablebase.probe(position)
+        if probed is None:
+            assert not forced_win(position, 30, memo)
+            continue
+        value, action = probed
+        distance = FOOD_SCORE * n_food + WIN_SCORE - value
+        assert forced_win(position, distance, memo)
+        assert not forced_win(position, distance - 1, memo)
+
+        record = position.make(0, action)
+        assert position.win or all(wins_after_ghost_move(position, move, distance - 1, memo)
+                                   for move in position.legal_moves(1))
+        position.unmake(record)
+        checked += 1
+    assert checked > 0
+
+
+@pytest.mark.parametrize("agent_module", [hminimax1, expectimax])
+@pytest.mark.parametrize("seed", range(4))
+def test_tablebase_agent_wins_within_the_probed_distance(seed, agent_module, new_state, tmp_path, play):
+    state = new_state("two_dots")
+    path = str(tmp_path / "two_dots")
+    build_tablebase(state.getWalls(), state.getFood().asList(), MAX_FOOD, path)
+    agent = agent_module.PacmanAgent(Namespace(tablebase=path))
+    rules = SearchRules(state.getWalls())
+    promised = []
+
+    def choose(state):
+        probed = agent.tablebase.probe(make_search_state(state, rules))
+        action = agent.get_action(state)
+        if probed is not None:
+            assert action == probed[1]
+            promised.append(probed[0])
+        return action
+
+    final = play(state, choose, seed, n_moves=40)
+    if promised:
+        assert final.isWin()
+        assert final.getScore() >= promised[0]
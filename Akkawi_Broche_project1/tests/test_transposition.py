@@ -0,0 +1,97 @@
+import importlib
+from argparse import Namespace
+
+import pytest
+
+from transposition import EXACT, LOWER, UPPER, TranspositionTable
+from zobrist import ZobristHasher
+
+
+def test_store_then_lookup_round_trip():
+    table = TranspositionTable(16)
+    table.store(5, 3, 1.5, LOWER, cut=True, move="North")
+    assert table.lookup(5) == (3, 1.5, LOWER, True, "North")
+    assert table.lookup(21) is None
+    assert table.best_move(5) == "North"
+
+
+@pytest.mark.parametrize("bound, alpha, beta, expected", [
+    (EXACT, 0., 1., (2., False)),
+    (LOWER, 0., 1., (2., False)),
+    (LOWER, 0., 3., None),
+    (UPPER, 2., 3., (2., False)),
+    (UPPER, 1., 3., None),
+])
+def test_probe_uses_the_bound_type(bound, alpha, beta, expected):
+    table = TranspositionTable(16)
+    table.store(7, 2, 2., bound)
+    assert table.probe(7, 2, alpha, beta) == expected
+
+
+def test_probe_ignores_shallower_entries_and_keeps_the_cut_flag():
+    table = TranspositionTable(16)
+    table.store(7, 2, 2., EXACT, cut=True)
+    assert table.probe(7, 3, 0., 1.) is None
+    assert table.probe(7, 1, 0., 1.) == (2., True)
+
+
+def test_depth_preferred_slot_is_kept_within_a_move():
+    table = TranspositionTable(4)
+    table.new_search()
+    table.store(1, 5, 1., EXACT)
+    table.store(5, 2, 2., EXACT)
+    assert table.lookup(1)[0] == 5
+    assert table.lookup(5)[0] == 2
+
+    table.new_search()
+    table.store(9, 1, 3., EXACT)
+    assert table.lookup(9)[0] == 1
+    assert table.lookup(1) is None
+
+
+def test_size_zero_disables_the_table():
+    table = TranspositionTable(0)
+    table.store(3, 1, 1., EXACT, move="East")
+    assert table.lookup(3) is None
+    assert table.probe(3, 1, 0., 2.) is None
+    assert table.best_move(3) is None
+
+
+def test_negative_size_is_rejected():
+    with pytest.raises(ValueError):
+        TranspositionTable(-1)
+
+
+def test_node_keys_tell_pacman_and_first_ghost_nodes_apart():
+    hasher = ZobristHasher(5, 5, n_ghosts=2)
+    assert hasher.node_key(42, 0) == 42
+    assert hasher.node_key(42, 1) != 42
+    assert hasher.node_key(42, 2) == 42
+
+
+@pytest.mark.parametrize("agent_name", ["minimax", "hminimax1"])
+def test_search_entries_are_relative_to_the_score(agent_name, new_state):
+    agent = importlib.import_module(agent_name).PacmanAgent(Namespace())
+    state = new_state("endgame")
+    action = agent.get_action(state)
+    key = agent.zobrist.key(state)
+    depth, value, bound, cut, move = agent.transpositions.lookup(agent.zobrist.node_key(key, 0))
+    assert bound == EXACT and move == action
+    assert value + state.getScore() == agent.actions_taken[key]
+    assert cut == (agent_name != "minimax")
+
+
+@pytest.mark.parametrize("agent_name", ["hminimax0", "hminimax1", "hminimax2"])
+def test_transposition_table_does_not_change_the_actions(agent_name, new_state, play):
+    games = []
+    for size in (0, 2 ** 16):
+        agent = importlib.import_module(agent_name).PacmanAgent(Namespace(ttsize=size))
+        actions = []
+
+        def choose(state):
+            actions.append(agent.get_action(state))
+            return actions[-1]
+
+        play(new_state("two_ghosts"), choose, seed=1, n_moves=15)
+        games.append(actions)
+    assert games[0] == games[1]
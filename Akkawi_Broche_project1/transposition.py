@@ -0,0 +1,91 @@
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class TranspositionTable:
+    def __init__(self, size=2 ** 16):
+        """
+        Transposition table kept by a PacmanAgent from one move to the next.
+        Each entry stores the remaining search depth, the value and the bound
+        type (EXACT, LOWER or UPPER bound) of a searched state, whether its
+        search reached the cut-off depth and the best move found.
+
+        NOTE:
+            Memory is capped at `size` slots in each of two tables indexed by
+            key % size: a depth-preferred table, whose entry is replaced by
+            deeper (or as deep) searches and by any search of a newer move,
+            and an always-replace table receiving every other entry.
+            A size of 0 disables the table: nothing is stored.
+
+        Arguments:
+        ----------
+        - `size`: number of slots of each table
+        """
+        if size < 0:
+            raise ValueError("The transposition table size must be 0 (disabled) or more, got {}".format(size))
+        self.size = size
+        self.depth_preferred = [None] * size
+        self.always_replace = [None] * size
+        self.generation = 0
+
+    def new_search(self):
+        """
+        Marks the start of the search of a new move, entries of the previous
+        moves become replaceable in the depth-preferred table.
+        """
+        self.generation += 1
+
+    def lookup(self, key):
+        """
+        Return:
+        -------
+        - The (depth, value, bound, cut, move) entry of `key`, None if not
+          stored.
+        """
+        if not self.size:
+            return None
+        slot = key % self.size
+        for table in (self.depth_preferred, self.always_replace):
+            entry = table[slot]
+            if entry is not None and entry[0] == key:
+                return entry[1:6]
+        return None
+
+    def probe(self, key, depth, alpha, beta):
+        """
+        Return:
+        -------
+        - (value, cut) if `key` was searched at least `depth` deep and its
+          bound is enough within (alpha, beta), cut telling whether its
+          search reached the cut-off depth, None otherwise.
+        """
+        entry = self.lookup(key)
+        if entry is None or entry[0] < depth:
+            return None
+        entry_depth, value, bound, cut, move = entry
+        if bound == EXACT or (bound == LOWER and value >= beta) or (bound == UPPER and value <= alpha):
+            return value, cut
+        return None
+
+    def best_move(self, key):
+        """
+        Return:
+        -------
+        - The best move stored for `key` whatever the depth of its search,
+          None if not stored.
+        """
+        entry = self.lookup(key)
+        return None if entry is None else entry[4]
+
+    def store(self, key, depth, value, bound, cut=False, move=None):
+        if not self.size:
+            return
+        slot = key % self.size
+        entry = (key, depth, value, bound, cut, move, self.generation)
+        preferred = self.depth_preferred[slot]
+        if (preferred is None or preferred[0] == key or preferred[1] <= depth
+                or preferred[6] != self.generation):
+            self.depth_preferred[slot] = entry
+        else:
+            self.always_replace[slot] = entry
@@ -0,0 +1,111 @@
+import random
+
+
+class ZobristHasher:
+    def __init__(self, width, height, n_ghosts=1, seed=0):
+        """
+        Zobrist hashing of Pacman game states: one random 64 bits integer
+        per cell for Pacman, for each ghost and for a food dot. The key of a
+        state is the xor of the integers of its Pacman position, ghost
+        positions and remaining food dots, so that it can be updated with a
+        few xor when a single agent moves.
+
+        NOTE:
+            With several ghosts, the states between two ghost moves of the
+            same turn are also marked with a random integer per ghost to
+            move (none when Pacman or the first ghost is to move, see
+            node_key to tell them apart).
+
+        Arguments:
+        ----------
+        - `width`, `height`: size of the layout
+        - `n_ghosts`: number of ghosts of the layout
+        - `seed`: seed of the random integers
+        """
+        rng = random.Random(seed)
+        self.height = height
+        self.pacman = [rng.getrandbits(64) for _ in range(width * height)]
+        self.ghosts = [[rng.getrandbits(64) for _ in range(width * height)]]
+        self.food = [rng.getrandbits(64) for _ in range(width * height)]
+        self.ghosts += [[rng.getrandbits(64) for _ in range(width * height)] for _ in range(n_ghosts - 1)]
+        # turn[i] marks the states where agent i is to move
+        self.turn = [0, 0] + [rng.getrandbits(64) for _ in range(n_ghosts - 1)]
+        # marks the node keys where the first ghost is to move (see node_key)
+        self.first_ghost_turn = rng.getrandbits(64)
+
+    @classmethod
+    def from_state(cls, state):
+        walls = state.getWalls()
+        return cls(walls.width, walls.height, state.getNumAgents() - 1)
+
+    def cell(self, position):
+        return int(position[0]) * self.height + int(position[1])
+
+    def key(self, state):
+        """
+        Returns a key that identifies a Pacman game state where Pacman is
+        to move (up to 64 bits hash collisions), computed from scratch.
+
+        Arguments:
+        ----------
+        - `state`: the current game state. See FAQ and class
+                   `pacman.GameState`.
+
+        Return:
+        -------
+        - A 64 bits integer.
+        """
+        current = self.pacman[self.cell(state.getPacmanPosition())]
+        for ghost, position in enumerate(state.getGhostPositions()):
+            current ^= self.ghosts[ghost][self.cell(position)]
+        for food in state.getFood().asList():
+            current ^= self.food[self.cell(food)]
+        return current
+
+    def node_key(self, current, agent):
+        """
+        Returns the key of the search node of key `current` where agent
+        `agent` is to move: unlike `current`, it differs between the MAX node
+        (Pacman to move) and the MIN node of the first ghost of the same
+        positions and food dots.
+        """
+        return current ^ self.first_ghost_turn if agent == 1 else current
+
+    def pacman_move(self, current, state, next_state):
+        """
+        Returns the key of `next_state` given the key `current` of
+        `state`, where `next_state` follows a Pacman move from `state`.
+        """
+        next_position = next_state.getPacmanPosition()
+        return self.pacman_step(current, state.getPacmanPosition(), next_position,
+                                state.hasFood(int(next_position[0]), int(next_position[1])))
+
+    def pacman_step(self, current, position, next_position, eats):
+        """
+        Returns the key of the state reached when Pacman moves from
+        `position` to `next_position` (eating a food dot if `eats`) in a
+        state of key `current`.
+        """
+        cell = self.cell(next_position)
+        current ^= self.pacman[self.cell(position)] ^ self.pacman[cell]
+        if eats:
+            current ^= self.food[cell]
+        return current
+
+    def ghost_move(self, current, state, next_state, ghost=1):
+        """
+        Returns the key of `next_state` given the key `current` of
+        `state`, where `next_state` follows a move of ghost `ghost` from
+        `state` (`next_state` is `state` if the ghost does not move).
+        """
+        return self.ghost_step(current, ghost, state.getGhostPosition(ghost), next_state.getGhostPosition(ghost))
+
+    def ghost_step(self, current, ghost, position, next_position):
+        """
+        Returns the key of the state reached when ghost `ghost` moves from
+        `position` to `next_position` in a state of key `current`.
+        """
+        table = self.ghosts[ghost - 1]
+        next_agent = ghost + 1 if ghost + 1 < len(self.turn) else 0
+        current ^= self.turn[ghost] ^ self.turn[next_agent]
+        return current ^ table[self.cell(position)] ^ table[self.cell(next_position)]
@@ -0,0 +1,285 @@
+"""
+Benchmark suite of the search agents (project 1) and of the belief filter
+(project 2).
+
+Every case replays a fixed-seed game (search agents) or a fixed-seed
+sequence of observations (belief filter) on one layout, in its own process
+so that its peak memory is measured alone and that each project imports its
+own 'pacman_module'. Results are written to a JSON file that can be compared
+with a stored baseline:
+
+    python benchmark.py --output results.json
+    python benchmark.py --output new.json --baseline results.json
+
+A case raising an error is recorded with its error message and the other
+cases still run. The run exits with status 1 when a case failed, when a
+metric regressed by more than the tolerance or when a game was not replayed
+with the same actions.
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import random
+import resource
+import sys
+import time
+import traceback
+from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SEARCH_DIR = os.path.join(ROOT, "Akkawi_Broche_project1")
+FILTER_DIR = os.path.join(ROOT, "projet_2_Akkawi_Broche")
+
+SEARCH_AGENTS = ["minimax", "hminimax0", "hminimax1", "hminimax2"]
+SEARCH_LAYOUTS = ["small_adv", "medium_adv", "large_adv"]
+FILTER_MODES = ["exact", "particles"]
+FILTER_LAYOUTS = ["large_filter", "large_filter_walls"]
+
+# metrics compared with the baseline, True when higher is better
+COMPARED_METRICS = {
+    "latency_p50": False,
+    "latency_p90": False,
+    "latency_p99": False,
+    "nodes_per_second": True,
+    "ticks_per_second": True,
+    "peak_rss_kb": False,
+}
+
+
+def load_layout(name):
+    """
+    Reads a layout file with the engine of the project searched first in
+    'sys.path' (each case runs in the process of its own project).
+
+    Arguments:
+    ----------
+    - `name`: path of a '.lay' file, or name of a layout of
+      'pacman_module/layouts'
+
+    Return:
+    -------
+    - The `layout.Layout` of the file.
+    """
+    from pacman_module import layout
+    path = name
+    if not name.endswith(".lay"):
+        path = os.path.join(os.path.dirname(layout.__file__), "layouts", name + ".lay")
+    with open(path) as lines:
+        return layout.Layout([line.rstrip("\n") for line in lines if line.strip()])
+
+
+def peak_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def latency_percentiles(latencies):
+    latencies = np.asarray(latencies)
+    return {
+        "latency_mean": float(latencies.mean()),
+        "latency_p50": float(np.percentile(latencies, 50)),
+        "latency_p90": float(np.percentile(latencies, 90)),
+        "latency_p99": float(np.percentile(latencies, 99)),
+        "latency_max": float(latencies.max()),
+    }
+
+
+def run_search_case(agent_name, layout_name, seed, max_moves):
+    """
+    Plays a game of `agent_name` on `layout_name` against ghosts moving at
+    random with the seed `seed`, for at most `max_moves` Pacman moves.
+
+    Return:
+    -------
+    - The metrics of the game as a dictionary.
+    """
+    sys.path.insert(0, SEARCH_DIR)
+    from pacman_module.pacman import GameState
+
+    rng = random.Random(seed)
+    layout = load_layout(layout_name)
+    state = GameState()
+    state.initialize(layout, layout.getNumGhosts())
+    agent = importlib.import_module(agent_name).PacmanAgent(Namespace(searchstats=True))
+
+    latencies = []
+    actions = []
+    while not (state.isWin() or state.isLose()) and len(actions) < max_moves:
+        start = time.perf_counter()
+        action = agent.get_action(state)
+        latencies.append(time.perf_counter() - start)
+        actions.append(str(action))
+        state = state.generateSuccessor(0, action)
+        for ghost in range(1, state.getNumAgents()):
+            if state.isWin() or state.isLose():
+                break
+            state = state.generateSuccessor(ghost, rng.choice(state.getLegalActions(ghost)))
+
+    nodes = sum(sum(move["nodes"]) for move in agent.stats.moves)
+    result = {
+        "moves": len(actions),
+        "score": state.getScore(),
+        "win": state.isWin(),
+        "actions_digest": hashlib.sha1(" ".join(actions).encode()).hexdigest(),
+        "nodes": nodes,
+        "nodes_per_second": nodes / sum(latencies) if latencies else 0.,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+    result.update(latency_percentiles(latencies))
+    return result
+
+
+def run_filter_case(mode, layout_name, seed, ticks, ghost_type, sensor_variance):
+    """
+    Runs `ticks` belief updates of BeliefStateAgent in inference mode `mode`
+    on `layout_name`. Pacman and the ghosts walk at random on the open cells
+    with the seed `seed`, evidences are noised as in
+    `BeliefStateAgent._get_evidence`.
+
+    Return:
+    -------
+    - The metrics of the run as a dictionary.
+    """
+    sys.path.insert(0, FILTER_DIR)
+    from bayesfilter import BeliefStateAgent
+
+    rng = np.random.RandomState(seed)
+    np.random.seed(seed)
+    layout = load_layout(layout_name)
+    walls = layout.walls
+    open_cells = [(x, y) for x in range(walls.width) for y in range(walls.height) if not walls[x][y]]
+
+    def walk(position):
+        x, y = position
+        moves = [(x + dx, y + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)) if not walls[x + dx][y + dy]]
+        return moves[rng.randint(len(moves))] if moves else position
+
+    agent = BeliefStateAgent(Namespace(ghostagent=ghost_type, sensorvariance=sensor_variance, inference=mode,
+                                       metricsformat="none"))
+    agent.walls = walls
+    n_ghosts = max(layout.getNumGhosts(), 1)
+    pacman = open_cells[rng.randint(len(open_cells))]
+    ghosts = [open_cells[rng.randint(len(open_cells))] for _ in range(n_ghosts)]
+    belief = np.zeros((walls.width, walls.height))
+    for x, y in open_cells:
+        belief[x, y] = 1.
+    agent.beliefGhostStates = [belief / belief.sum() for _ in range(n_ghosts)]
+
+    latencies = []
+    for _ in range(ticks):
+        pacman = walk(pacman)
+        ghosts = [walk(ghost) for ghost in ghosts]
+        evidences = [abs(x - pacman[0]) + abs(y - pacman[1]) + rng.binomial(agent.n, agent.p) - agent.n * agent.p
+                     for x, y in ghosts]
+        start = time.perf_counter()
+        agent.update_belief_state(evidences, pacman, [False] * n_ghosts)
+        latencies.append(time.perf_counter() - start)
+
+    result = {
+        "ticks": ticks,
+        "ticks_per_second": ticks / sum(latencies) if latencies else 0.,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+    result.update(latency_percentiles(latencies))
+    return result
+
+
+def run_case(kind, *args):
+    """
+    Runs a case in a new process and returns its metrics, or {"error": message} if the case raised an error
+    or its process died.
+    """
+    run = run_search_case if kind == "search" else run_filter_case
+    try:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            return executor.submit(run, *args).result()
+    except Exception as error:
+        return {"error": "".join(traceback.format_exception_only(type(error), error)).strip()}
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares the cases of `results` with the same cases of `baseline`.
+
+    Arguments:
+    ----------
+    - `results`, `baseline`: dictionaries of case name to metrics
+    - `tolerance`: relative change of a metric above which it regressed
+
+    Return:
+    -------
+    - The list of regressions as human readable strings.
+    """
+    regressions = []
+    for case, metrics in sorted(results.items()):
+        if case not in baseline or "error" in metrics:
+            continue
+        reference = baseline[case]
+        if "actions_digest" in metrics and metrics["actions_digest"] != reference.get("actions_digest"):
+            regressions.append("{}: actions differ from the baseline".format(case))
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            if metric not in metrics or not reference.get(metric):
+                continue
+            change = (metrics[metric] - reference[metric]) / reference[metric]
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append("{}: {} {:.4g} -> {:.4g} ({:+.1%})".format(
+                    case, metric, reference[metric], metrics[metric], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", nargs="*", default=SEARCH_AGENTS)
+    parser.add_argument("--layouts", nargs="*", default=SEARCH_LAYOUTS)
+    parser.add_argument("--filter-modes", nargs="*", default=FILTER_MODES)
+    parser.add_argument("--filter-layouts", nargs="*", default=FILTER_LAYOUTS)
+    parser.add_argument("--seeds", nargs="*", type=int, default=[0])
+    parser.add_argument("--max-moves", type=int, default=100)
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--ghostagent", default="scared")
+    parser.add_argument("--sensorvariance", type=float, default=1.)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    results = dict()
+    for seed in args.seeds:
+        for layout_name in args.layouts:
+            for agent_name in args.agents:
+                case = "{}/{}/seed{}".format(agent_name, layout_name, seed)
+                print("running", case, flush=True)
+                results[case] = run_case("search", agent_name, layout_name, seed, args.max_moves)
+                if "error" in results[case]:
+                    print("FAILED", case, results[case]["error"], flush=True)
+        for layout_name in args.filter_layouts:
+            for mode in args.filter_modes:
+                case = "bayesfilter-{}/{}/seed{}".format(mode, layout_name, seed)
+                print("running", case, flush=True)
+                results[case] = run_case("filter", mode, layout_name, seed, args.ticks, args.ghostagent,
+                                         args.sensorvariance)
+                if "error" in results[case]:
+                    print("FAILED", case, results[case]["error"], flush=True)
+
+    with open(args.output, "w") as output:
+        json.dump({"python": sys.version.split()[0], "cases": results}, output, indent=2, sort_keys=True)
+
+    failures = sorted(case for case, metrics in results.items() if "error" in metrics)
+    regressions = []
+    if args.baseline is not None:
+        with open(args.baseline) as baseline:
+            regressions = compare(results, json.load(baseline)["cases"], args.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression)
+    if failures:
+        print("{} of {} cases failed: {}".format(len(failures), len(results), ", ".join(failures)))
+    sys.exit(1 if failures or regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
 # Complete this class for all parts of the project
 
+from collections import OrderedDict
+
 from pacman_module.game import Agent
 import numpy as np
 from pacman_module import util
+from scipy import sparse
 from scipy.stats import binom
 
+from adjacency import MoveAdjacency
+from belief_statistics import belief_statistics
+from metrics import make_metrics_sink
+
 
 class BeliefStateAgent(Agent):
     def __init__(self, args):
@@ -38,6 +45,46 @@ class BeliefStateAgent(Agent):
 
         # XXX: Your code here
         # NB: Adding code here is not necessarily useful, but you may.
+
+        # Walls grid as a numpy array (assigned in '_get_walls_array' method)
+        self._walls_array = None
+
+        # Legal moves of every open cell as flat arrays (assigned in
+        # '_get_adjacency' method, see 'adjacency.py')
+        self._adjacency = None
+
+        # Transition models memoized per pacman position, least recently
+        # used models are evicted once 'transition_cache_size' is reached.
+        # With 'transition_cache_warmup', the models of every cell reachable
+        # by pacman are computed at the first call to 'get_action'.
+        self.transition_cache_size = getattr(self.args, "transitioncachesize", 256)
+        self.transition_cache_warmup = getattr(self.args, "transitioncachewarmup", False)
+        self.transition_cache_hits = 0
+        self.transition_cache_misses = 0
+        self._transition_cache = OrderedDict()
+        self._transition_cache_warmed = False
+
+        # P(noise + n * p = x) for every x in the support {0, ..., n} of the
+        # sensor binomial distribution, and manhattan distance fields to
+        # pacman (assigned in '_get_distance_field' method)
+        self._sensor_pmf = binom.pmf(np.arange(self.n + 1), self.n, self.p)
+        self._distance_fields = OrderedDict()
+
+        # Inference mode: "exact" grid filter or "particles" filter, the
+        # latter tracking each ghost with 'n_particles' samples of its
+        # position stored as a [Z, n_particles] array of flattened cells
+        self.inference = getattr(self.args, "inference", "exact")
+        self.n_particles = getattr(self.args, "nparticles", 1000)
+        self._particles = None
+
+        # Metrics rows are buffered by a sink (see 'metrics.py') and written
+        # every 'metrics_flush_interval' ticks and at the end of the game
+        # (see 'final' method), the sink is assigned at the first call of
+        # '_record_metrics' method
+        self.metrics_format = getattr(self.args, "metricsformat", "text")
+        self.metrics_path = getattr(self.args, "metricspath", "confidence_quality_metrics_walls_scared_10.txt")
+        self.metrics_flush_interval = getattr(self.args, "metricsflushinterval", 1000)
+        self._metrics_sink = None
         # XXX: End of your code
 
     def _get_sensor_model(self, pacman_position, evidence):
@@ -55,29 +102,116 @@ class BeliefStateAgent(Agent):
         The element at position (w, h) is the probability
         P(E_t=evidence | X_t=(w, h))
         """
-        sensor_model = np.zeros((self.walls.width, self.walls.height))
-        for i in range(self.walls.width):
-            for j in range(self.walls.height):
-                sensor_model[i][j] = binom.pmf(evidence - util.manhattanDistance((i, j), pacman_position)
-                                               + self.n * self.p, self.n, self.p)
-        return sensor_model
+        return self._get_sensor_models(pacman_position, [evidence])[0]
 
-    def _get_transition_model(self, pacman_position):
+    def _get_sensor_models(self, pacman_position, evidences):
         """
         Arguments:
         ----------
         - `pacman_position`: 2D coordinates position
           of pacman at state x_{t}
           where 't' is the current time step
+        - `evidences`: list of Z distances between
+          pacman and ghosts at state x_{t}
 
         Return:
         -------
-        The transition model represented as a 4D numpy array of
-        size [width, height, width, height].
-        The element at position (w1, h1, w2, h2) is the probability
-        P(X_t+1=(w1, h1) | X_t=(w2, h2))
+        The Z sensor models represented as a 3D numpy array of
+        size [Z, width, height].
+        The element at position (z, w, h) is the probability
+        P(E_t=evidences[z] | X_t=(w, h))
+        """
+        evidences = np.asarray(evidences, dtype=float).reshape((-1, 1, 1))
+        return self._get_sensor_probability(evidences, self._get_distance_field(pacman_position))
+
+    def _get_sensor_probability(self, evidences, distances):
+        """
+        Arguments:
+        ----------
+        - `evidences`: numpy array of (noised) distances
+        - `distances`: numpy array of true distances, broadcastable
+          against `evidences`
+
+        Return:
+        -------
+        The probabilities P(E_t=evidences | distances) looked up
+        in the precomputed binomial PMF table.
+        """
+        # binom.pmf is 0 outside of the integer support {0, ..., n}
+        support = evidences - distances + self.n * self.p
+        in_support = (support == np.floor(support)) & (support >= 0) & (support <= self.n)
+        pmf_index = np.where(in_support, support, 0).astype(int)
+        return np.where(in_support, self._sensor_pmf[pmf_index], 0.)
+
+    def _get_walls_array(self):
+        """
+        Return:
+        -------
+        The walls grid as a 2D boolean numpy array of size [width, height].
+        Walls never change during a game so the array is built only once.
+        """
+        if self._walls_array is None:
+            self._walls_array = np.array(self.walls.data, dtype=bool)
+        return self._walls_array
+
+    def _get_adjacency(self):
+        """
+        Return:
+        -------
+        The open neighbours of every open cell of the walls grid as a
+        MoveAdjacency, built only once.
         """
-        transition_model = np.zeros((self.walls.width, self.walls.height, self.walls.width, self.walls.height))
+        if self._adjacency is None:
+            self._adjacency = MoveAdjacency(self.walls)
+        return self._adjacency
+
+    def _get_distance_field(self, pacman_position):
+        """
+        Arguments:
+        ----------
+        - `pacman_position`: 2D coordinates position
+          of pacman at state x_{t}
+          where 't' is the current time step
+
+        Return:
+        -------
+        The manhattan distances to pacman represented as a 2D numpy array
+        of size [width, height], cached per pacman position.
+        """
+        pacman_position = (int(pacman_position[0]), int(pacman_position[1]))
+        if pacman_position in self._distance_fields:
+            self._distance_fields.move_to_end(pacman_position)
+            return self._distance_fields[pacman_position]
+
+        xs, ys = np.indices((self.walls.width, self.walls.height))
+        distance = np.abs(xs - pacman_position[0]) + np.abs(ys - pacman_position[1])
+        self._distance_fields[pacman_position] = distance
+        if len(self._distance_fields) > max(self.transition_cache_size, 1):
+            self._distance_fields.popitem(last=False)
+        return distance
+
+    def _get_sparse_transition_model(self, pacman_position):
+        """
+        Arguments:
+        ----------
+        - `pacman_position`: 2D coordinates position
+          of pacman at state x_{t}
+          where 't' is the current time step
+
+        Return:
+        -------
+        The transition model represented as a scipy CSR matrix of
+        size [width * height, width * height].
+        The element at position (w1 * height + h1, w2 * height + h2)
+        is the probability P(X_t+1=(w1, h1) | X_t=(w2, h2))
+
+        NOTE:
+            A ghost can only move to one of its 4 open neighbours, so the
+            model is built from the moves of the adjacency index (see
+            '_get_adjacency') and holds at most 4 non zero entries per cell.
+        """
+        adjacency = self._get_adjacency()
+        width, height = adjacency.width, adjacency.height
         k = 1
         if self.ghost_type == "scared":
             k = 3
@@ -85,34 +219,170 @@ class BeliefStateAgent(Agent):
             k = 1
         if self.ghost_type == "confused":
             k = 0
-        normalizer = dict()
-        for w1 in range(self.walls.width):
-                for h1 in range(self.walls.height):
-
-                    if not self.walls[w1][h1]:
-                        t_plus_1_distance = util.manhattanDistance(pacman_position, (w1, h1))
-
-                        for w2 in range(self.walls.width):
-                            for h2 in range(self.walls.height):
-                                normalizer.setdefault((w2, h2), 0)
-                                if ((w1 == w2+1 and h1 == h2) or (w1 == w2-1 and h1 == h2) or
-                                    (w1 == w2 and h1 == h2+1) or (w1 == w2 and h1 == h2-1)) and (not self.walls[w2][h2]):
-                                    t_distance = util.manhattanDistance(pacman_position, (w2, h2))
-                                    if t_plus_1_distance > t_distance:
-                                        transition_model[w1][h1][w2][h2] = np.power(2, k)
-                                        normalizer[(w2, h2)] += np.power(2, k)
-                                    else:
-                                        transition_model[w1][h1][w2][h2] = 1
-                                        normalizer[(w2, h2)] += 1
-                                else:
-                                    transition_model[w1][h1][w2][h2] = 0
-        for w1 in range(self.walls.width):
-            for h1 in range(self.walls.height):
-                for w2 in range(self.walls.width):
-                    for h2 in range(self.walls.height):
-                        if not self.walls[w2][h2] and normalizer[(w2, h2)]!= 0:
-                            transition_model[w1][h1][w2][h2] = transition_model[w1][h1][w2][h2]/normalizer[(w2, h2)]
-        return transition_model
+
+        distance = self._get_distance_field(pacman_position).ravel()
+
+        # move of a ghost from the open cell (w2, h2) to its open neighbour (w1, h1)
+        rows = adjacency.flat[adjacency.neighbours]
+        cols = adjacency.flat[adjacency.sources]
+        weights = np.where(distance[rows] > distance[cols], np.power(2., k), 1.)
+        normalizer = np.bincount(cols, weights=weights, minlength=width * height)
+        weights = weights / normalizer[cols]
+
+        return sparse.csr_matrix((weights, (rows, cols)), shape=(width * height, width * height))
+
+    def _get_cached_transition_model(self, pacman_position):
+        """
+        Arguments:
+        ----------
+        - `pacman_position`: 2D coordinates position
+          of pacman at state x_{t}
+          where 't' is the current time step
+
+        Return:
+        -------
+        The sparse transition model of `_get_sparse_transition_model`,
+        taken from the cache when pacman already visited this position.
+        """
+        pacman_position = (int(pacman_position[0]), int(pacman_position[1]))
+        if pacman_position in self._transition_cache:
+            self.transition_cache_hits += 1
+            self._transition_cache.move_to_end(pacman_position)
+            return self._transition_cache[pacman_position]
+
+        self.transition_cache_misses += 1
+        trans_model = self._get_sparse_transition_model(pacman_position)
+        if self.transition_cache_size > 0:
+            self._transition_cache[pacman_position] = trans_model
+            if len(self._transition_cache) > self.transition_cache_size:
+                self._transition_cache.popitem(last=False)
+        return trans_model
+
+    def _warm_up_transition_cache(self, pacman_position):
+        """
+        Fills the transition cache with the models of the cells reachable
+        from `pacman_position` (breadth first), up to the cache size.
+
+        Arguments:
+        ----------
+        - `pacman_position`: 2D coordinates position
+          of pacman at state x_{t}
+          where 't' is the current time step
+        """
+        adjacency = self._get_adjacency()
+        start = adjacency.cell(pacman_position)
+        reached = {start}
+        frontier = [start]
+        while frontier and len(self._transition_cache) < self.transition_cache_size:
+            next_frontier = []
+            for cell in frontier:
+                position = adjacency.positions[cell]
+                if position not in self._transition_cache:
+                    self._transition_cache[position] = self._get_sparse_transition_model(position)
+                    if len(self._transition_cache) == self.transition_cache_size:
+                        break
+                moves = slice(adjacency.offsets[cell], adjacency.offsets[cell + 1])
+                for neighbour in adjacency.neighbours[moves].tolist():
+                    if neighbour not in reached:
+                        reached.add(neighbour)
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        self._transition_cache_warmed = True
+
+    def _get_transition_model(self, pacman_position):
+        """
+        Arguments:
+        ----------
+        - `pacman_position`: 2D coordinates position
+          of pacman at state x_{t}
+          where 't' is the current time step
+
+        Return:
+        -------
+        The transition model represented as a 4D numpy array of
+        size [width, height, width, height].
+        The element at position (w1, h1, w2, h2) is the probability
+        P(X_t+1=(w1, h1) | X_t=(w2, h2))
+
+        NOTE:
+            Dense view of `_get_sparse_transition_model`, the belief update
+            only uses the sparse matrix.
+        """
+        width, height = self.walls.width, self.walls.height
+        sparse_model = self._get_sparse_transition_model(pacman_position)
+        return sparse_model.toarray().reshape((width, height, width, height))
+
+    def _get_particle_belief(self, belief, evidences, pacman_position, ghosts_eaten):
+        """
+        Particle filter alternative to the exact update of
+        `_get_updated_belief`, same arguments and return value.
+
+        NOTE:
+            Particles are moved by sampling the same transition model as
+            the exact filter, weighted by the sensor model and resampled
+            with systematic resampling. Belief states are the normalized
+            histograms of the particles.
+        """
+        width, height = self.walls.width, self.walls.height
+        n_cells = width * height
+        pacman_cell = int(pacman_position[0]) * height + int(pacman_position[1])
+
+        if self._particles is None:
+            self._particles = np.empty((len(belief), self.n_particles), dtype=int)
+            for e in range(len(belief)):
+                prior = np.ravel(belief[e])
+                if prior.sum() > 0:
+                    self._particles[e] = np.random.choice(n_cells, self.n_particles, p=prior / prior.sum())
+                else:
+                    self._particles[e] = np.random.choice(np.flatnonzero(~self._get_walls_array()),
+                                                          self.n_particles)
+
+        # Prediction: each particle follows one of the (at most 4) entries
+        # of its column in the transition model
+        trans_model = self._get_cached_transition_model(pacman_position).tocsc()
+        start = trans_model.indptr[:-1][self._particles]
+        size = np.diff(trans_model.indptr)[self._particles]
+        last_entry = max(trans_model.nnz - 1, 0)
+        draw = np.random.random_sample(self._particles.shape)
+        cumulative = np.zeros(self._particles.shape)
+        offset = np.zeros(self._particles.shape, dtype=int)
+        for j in range(int(size.max(initial=0)) - 1):
+            cumulative += np.where(j < size, trans_model.data[np.minimum(start + j, last_entry)], 0.)
+            offset += (j < size - 1) & (cumulative < draw)
+        moved = size > 0
+        self._particles[moved] = trans_model.indices[(start + offset)[moved]]
+
+        # Correction: likelihood weighting and systematic resampling
+        xs, ys = np.divmod(self._particles, height)
+        distances = np.abs(xs - pacman_position[0]) + np.abs(ys - pacman_position[1])
+        evidences = np.asarray(evidences, dtype=float).reshape((-1, 1))
+        weights = self._get_sensor_probability(evidences, distances)
+        weights[self._particles == pacman_cell] = 0
+
+        positions = (np.random.random_sample() + np.arange(self.n_particles)) / self.n_particles
+        for e in range(len(belief)):
+            if ghosts_eaten[e]:
+                belief[e] = np.zeros((width, height))
+                continue
+            total = weights[e].sum()
+            if total == 0:
+                # all particles are inconsistent with the evidence,
+                # they are drawn again from the sensor model alone
+                likelihood = self._get_sensor_models(pacman_position, [evidences[e, 0]])[0].ravel()
+                likelihood[self._get_walls_array().ravel()] = 0
+                likelihood[pacman_cell] = 0
+                if likelihood.sum() > 0:
+                    self._particles[e] = np.random.choice(n_cells, self.n_particles,
+                                                          p=likelihood / likelihood.sum())
+            else:
+                cumulative_weights = np.cumsum(weights[e]) / total
+                chosen = np.searchsorted(cumulative_weights, positions)
+                self._particles[e] = self._particles[e][np.minimum(chosen, self.n_particles - 1)]
+
+            histogram = np.bincount(self._particles[e], minlength=n_cells) / self.n_particles
+            belief[e] = histogram.reshape((width, height))
+
+        return belief
 
     def _get_updated_belief(self, belief, evidences, pacman_position, ghosts_eaten):
         """
@@ -147,24 +417,28 @@ class BeliefStateAgent(Agent):
         """
 
         # XXX: Your code here
-        trans_model = self._get_transition_model(pacman_position)
+        if self.transition_cache_warmup and not self._transition_cache_warmed:
+            self._warm_up_transition_cache(pacman_position)
+        if self.inference == "particles":
+            return self._get_particle_belief(belief, evidences, pacman_position, ghosts_eaten)
+
+        width, height = self.walls.width, self.walls.height
+        trans_model = self._get_cached_transition_model(pacman_position)
+
+        # The Z beliefs are stacked as the rows of a [Z, width * height]
+        # matrix so that every ghost is predicted by a single product with
+        # the transition model. Eaten ghosts are masked out.
+        alive = np.logical_not(np.asarray(ghosts_eaten, dtype=bool)).reshape((-1, 1))
+        beliefs = np.stack([np.ravel(b) for b in belief]) * alive
+        push = (trans_model @ beliefs.T).T.reshape((-1, width, height))
+        push[:, pacman_position[0], pacman_position[1]] = 0
+
+        updated = self._get_sensor_models(pacman_position, evidences) * push
+        alpha = updated.sum(axis=(1, 2), keepdims=True)
+        updated = np.divide(updated, alpha, out=updated, where=alpha != 0)
 
         for e in range(len(belief)):
-            push = np.zeros((self.walls.width, self.walls.height))
-            if ghosts_eaten[e] == 0:
-                sensor_model = self._get_sensor_model(pacman_position, evidences[e])
-                for i in range(self.walls.width):
-                    for j in range(self.walls.height):
-                        if (not self.walls[i][j]) and (not pacman_position == (i, j)):
-                            for u in range(self.walls.width):
-                                for v in range(self.walls.height):
-                                    push[i][j] += trans_model[i][j][u][v] * belief[e][u][v]
-                belief[e] = sensor_model * push
-                alpha = np.sum(belief[e])
-                if alpha != 0:
-                    belief[e] = np.divide(belief[e], alpha)
-            else:
-                belief[e] = np.zeros((self.walls.width, self.walls.height))
+            belief[e] = updated[e]
         # XXX: End of your code
 
         return belief
@@ -249,30 +523,33 @@ class BeliefStateAgent(Agent):
         N.B. : [0,0] is the bottom left corner of the maze
         """
 
-        records = open("confidence_quality_metrics walls scared 10"+".txt", "a")
-        max_position_array = np.where(belief_states[0].max() == belief_states[0])
-        max_position = (max_position_array[0][0], max_position_array[1][0])
-
-        ghost_position = state.getGhostPosition(1)
-        M,N = belief_states[0].shape
-        mean_position = np.zeros(2)
-        for i in range(M):
-            for j in range(N):
-                mean_position = np.add(mean_position, np.array([i, j])*belief_states[0][i][j])
-        mean_position = [round(u) for u in mean_position]
-        mean_position = (mean_position[0], mean_position[1])
-        quality = util.manhattanDistance(mean_position, ghost_position)
-        # print(f"ghost pos: {ghost_position}")
-        # print(f"max pos: {max_position}")
-        # print(f"mean pos: {mean_position} \n")
-        variance = 0
-        for i in range(M):
-            for j in range(N):
-                variance += (util.manhattanDistance(mean_position, (i,j))**2)*belief_states[0][i][j]
-        std = (variance)**0.5
-
-        records.write(str(round(std, 4))+"\t"+str(quality)+"\n")
-        records.close()
+        statistics = belief_statistics(np.stack(belief_states), state.getGhostPositions())
+
+        if self._metrics_sink is None:
+            columns = []
+            for z in range(len(belief_states)):
+                columns += ["std_{}".format(z), "quality_{}".format(z),
+                            "entropy_{}".format(z), "argmax_error_{}".format(z)]
+            self._metrics_sink = make_metrics_sink(self.metrics_format, self.metrics_path,
+                                                   columns, self.metrics_flush_interval)
+
+        row = np.stack((np.round(statistics["spread"], 4), statistics["mean_error"],
+                        statistics["entropy"], statistics["argmax_error"]), axis=-1)
+        self._metrics_sink.record(row.ravel())
+
+    def final(self, state):
+        """
+        Called by the game when it ends: writes the metrics rows still
+        buffered and closes the sink, the next game opens a new one.
+
+        Arguments:
+        ----------
+        - `state`: the final game state.
+                   See FAQ and class `pacman.GameState`.
+        """
+        if self._metrics_sink is not None:
+            self._metrics_sink.close()
+            self._metrics_sink = None
 
     def get_action(self, state):
         """
@@ -0,0 +1,119 @@
+"""
+Statistics of belief states over ghost positions.
+
+Used by 'BeliefStateAgent._record_metrics' at every tick and usable offline
+on recorded beliefs: every function accepts arrays of shape [..., N, M]
+(e.g. [Z, N, M] for the Z ghosts of one tick or [T, Z, N, M] for a whole
+game) and returns one value per belief state.
+"""
+
+import numpy as np
+
+
+def argmax_position(beliefs):
+    """
+    Return:
+    -------
+    - The most likely position of each belief state as an integer array
+      of shape [..., 2] (first maximum in row major order).
+    """
+    beliefs = np.asarray(beliefs)
+    flat = beliefs.reshape(beliefs.shape[:-2] + (-1,)).argmax(axis=-1)
+    return np.stack(np.unravel_index(flat, beliefs.shape[-2:]), axis=-1)
+
+
+def mean_position(beliefs):
+    """
+    Return:
+    -------
+    - The expected position of each belief state as an array of
+      shape [..., 2], NaN for belief states without any mass
+      (e.g. eaten ghosts).
+    """
+    beliefs = np.asarray(beliefs, dtype=float)
+    xs, ys = np.indices(beliefs.shape[-2:])
+    mass = beliefs.sum(axis=(-2, -1))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = (beliefs * xs).sum(axis=(-2, -1)) / mass
+        mean_y = (beliefs * ys).sum(axis=(-2, -1)) / mass
+    return np.stack((mean_x, mean_y), axis=-1)
+
+
+def manhattan_spread(beliefs, center=None):
+    """
+    Arguments:
+    ----------
+    - `beliefs`: belief states of shape [..., N, M]
+    - `center`: positions of shape [..., 2] around which the spread is
+      measured, defaults to the rounded mean positions
+
+    Return:
+    -------
+    - The square root of the expected squared manhattan distance to
+      `center` of each belief state.
+    """
+    beliefs = np.asarray(beliefs, dtype=float)
+    if center is None:
+        center = np.round(mean_position(beliefs))
+    center = np.asarray(center, dtype=float)
+    xs, ys = np.indices(beliefs.shape[-2:])
+    distance = (np.abs(xs - center[..., 0, None, None])
+                + np.abs(ys - center[..., 1, None, None]))
+    return np.sqrt((distance ** 2 * beliefs).sum(axis=(-2, -1)))
+
+
+def entropy(beliefs):
+    """
+    Return:
+    -------
+    - The Shannon entropy (in bits) of each belief state.
+    """
+    beliefs = np.asarray(beliefs, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        terms = np.where(beliefs > 0, beliefs * np.log2(beliefs), 0.)
+    return -terms.sum(axis=(-2, -1))
+
+
+def position_error(positions, true_positions):
+    """
+    Return:
+    -------
+    - The manhattan distances between `positions` and `true_positions`,
+      both of shape [..., 2].
+    """
+    positions = np.asarray(positions, dtype=float)
+    true_positions = np.asarray(true_positions, dtype=float)
+    return np.abs(positions - true_positions).sum(axis=-1)
+
+
+def belief_statistics(beliefs, true_positions=None):
+    """
+    Computes all the statistics of a batch of belief states at once.
+
+    Arguments:
+    ----------
+    - `beliefs`: belief states of shape [..., N, M]
+    - `true_positions`: true ghost positions of shape [..., 2], optional
+
+    Return:
+    -------
+    - A dictionary of arrays with keys "argmax", "mean", "spread" and
+      "entropy", plus "mean_error" and "argmax_error" when
+      `true_positions` is given. The spread and the mean error are
+      measured from the rounded mean position.
+    """
+    beliefs = np.asarray(beliefs, dtype=float)
+    argmax = argmax_position(beliefs)
+    mean = mean_position(beliefs)
+    rounded_mean = np.round(mean)
+
+    statistics = {
+        "argmax": argmax,
+        "mean": mean,
+        "spread": manhattan_spread(beliefs, rounded_mean),
+        "entropy": entropy(beliefs),
+    }
+    if true_positions is not None:
+        statistics["mean_error"] = position_error(rounded_mean, true_positions)
+        statistics["argmax_error"] = position_error(argmax, true_positions)
+    return statistics
@@ -0,0 +1,180 @@
+"""
+Metrics sinks used by 'BeliefStateAgent._record_metrics'.
+
+Rows of metrics are kept in an in-memory buffer and written in bulk every
+'flush_interval' rows (and when the sink is closed), instead of opening the
+output file at every tick.
+"""
+
+import abc
+import atexit
+import glob
+import os
+
+import numpy as np
+
+# sinks not closed yet, in creation order
+_open_sinks = dict()
+
+
+@atexit.register
+def _close_open_sinks():
+    """
+    Closes the sinks still open when the interpreter exits (games that did
+    not end normally), in the order they were created.
+    """
+    for sink in list(_open_sinks):
+        sink.close()
+
+
+class MetricsSink(abc.ABC):
+    def __init__(self, path, columns, flush_interval=1000):
+        """
+        Arguments:
+        ----------
+        - `path`: path of the output file
+        - `columns`: names of the recorded metrics
+        - `flush_interval`: number of rows kept in memory before
+          they are written to the output
+        """
+        self.path = path
+        self.columns = list(columns)
+        self.flush_interval = max(int(flush_interval), 1)
+
+        self._buffer = np.zeros((self.flush_interval, len(self.columns)))
+        self._size = 0
+        self._closed = False
+
+        # closed at game end (see 'BeliefStateAgent.final'), or when the
+        # interpreter exits
+        _open_sinks[self] = None
+
+    def record(self, row):
+        """
+        Appends a row of metrics (one value per column) to the buffer,
+        the buffer is flushed when full.
+        """
+        self._buffer[self._size] = row
+        self._size += 1
+        if self._size == self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered rows to the output and empties the buffer.
+        """
+        if self._size:
+            self._write(self._buffer[:self._size])
+            self._size = 0
+
+    def close(self):
+        """
+        Writes the remaining rows and releases the buffer, the sink must not
+        be used anymore.
+        """
+        if not self._closed:
+            self.flush()
+            self._closed = True
+            self._buffer = None
+            _open_sinks.pop(self, None)
+
+    @abc.abstractmethod
+    def _write(self, rows):
+        """
+        Writes `rows` (a 2D numpy array, one row per record) to the output.
+        """
+
+
+class TextMetricsSink(MetricsSink):
+    """
+    Appends the rows to a tab separated text file.
+    """
+
+    def _write(self, rows):
+        with open(self.path, "a") as records:
+            np.savetxt(records, rows, fmt="%.10g", delimiter="\t")
+
+
+class NpzMetricsSink(MetricsSink):
+    """
+    Writes every flushed buffer as a columnar chunk '<path>_<chunk>.npz'
+    holding one array per column.
+
+    NOTE:
+        Chunk files are created exclusively (O_EXCL) with the first free
+        chunk number, so that sinks writing to the same path never overwrite
+        each other's chunks.
+    """
+
+    def __init__(self, path, columns, flush_interval=1000):
+        super().__init__(path, columns, flush_interval)
+        self._stem = os.path.splitext(path)[0]
+        self._chunk = len(glob.glob(self._stem + "_*.npz"))
+
+    def _write(self, rows):
+        while True:
+            chunk_path = "{}_{:05d}.npz".format(self._stem, self._chunk)
+            try:
+                descriptor = os.open(chunk_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+                break
+            except FileExistsError:
+                self._chunk += 1
+        with os.fdopen(descriptor, "wb") as chunk:
+            np.savez(chunk, **{column: rows[:, i] for i, column in enumerate(self.columns)})
+        self._chunk += 1
+
+
+class NullMetricsSink(MetricsSink):
+    """
+    Drops every row, disables metrics recording.
+    """
+
+    def record(self, row):
+        pass
+
+    def _write(self, rows):
+        pass
+
+
+SINKS = {
+    "text": TextMetricsSink,
+    "npz": NpzMetricsSink,
+    "none": NullMetricsSink,
+}
+
+
+def make_metrics_sink(kind, path, columns, flush_interval=1000):
+    """
+    Arguments:
+    ----------
+    - `kind`: one of the keys of `SINKS`
+    - `path`, `columns`, `flush_interval`: see `MetricsSink`
+
+    Return:
+    -------
+    - A metrics sink of the requested kind.
+    """
+    if kind not in SINKS:
+        raise ValueError("Unknown metrics sink '{}', expected one of {}".format(kind, sorted(SINKS)))
+    return SINKS[kind](path, columns, flush_interval)
+
+
+def load_metrics(path):
+    """
+    Reads back the metrics written by a sink at `path`.
+
+    Return:
+    -------
+    - A dictionary mapping column names to 1D numpy arrays for npz
+      chunks, or a 2D numpy array (one row per record) for text files.
+    """
+    chunks = sorted(glob.glob(os.path.splitext(path)[0] + "_*.npz"))
+    if not chunks:
+        return np.loadtxt(path, delimiter="\t", ndmin=2)
+
+    columns = dict()
+    for chunk in chunks:
+        with np.load(chunk) as data:
+            for column in data.files:
+                columns.setdefault(column, []).append(data[column])
+    return {column: np.concatenate(values) for column, values in columns.items()}
@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def random_walls():
+    """
+    Returns a function giving a walls grid of size [width, height] closed
+    by a border, with each inner cell drawn as a wall with probability
+    `density` by a generator seeded with `seed`.
+    """
+    game = pytest.importorskip("pacman_module.game")
+
+    def random_walls(seed, width=8, height=6, density=0.25):
+        rng = np.random.RandomState(seed)
+        walls = game.Grid(width, height)
+        for x in range(width):
+            for y in range(height):
+                border = x in (0, width - 1) or y in (0, height - 1)
+                walls[x][y] = bool(border or rng.random_sample() < density)
+        return walls
+
+    return random_walls
+
+
+@pytest.fixture
+def new_agent():
+    """
+    Returns a function giving a BeliefStateAgent already bound to the grid
+    `walls`, the other keyword arguments are set as command-line options.
+    """
+    pytest.importorskip("pacman_module.game")
+    pytest.importorskip("scipy")
+    from bayesfilter import BeliefStateAgent
+
+    def new_agent(walls, ghostagent="confused", sensorvariance=1.0, **options):
+        args = argparse.Namespace(ghostagent=ghostagent, sensorvariance=sensorvariance, **options)
+        agent = BeliefStateAgent(args)
+        agent.walls = walls
+        return agent
+
+    return new_agent
+
@@ -0,0 +1,66 @@
+import numpy as np
+
+from belief_statistics import belief_statistics
+
+
+def baseline_metrics(belief, ghost_position):
+    """
+    The std and quality of one belief state as the original
+    '_record_metrics' computed them.
+    """
+    M, N = belief.shape
+    mean_position = np.zeros(2)
+    for i in range(M):
+        for j in range(N):
+            mean_position = np.add(mean_position, np.array([i, j]) * belief[i][j])
+    mean_position = [round(u) for u in mean_position]
+    quality = abs(mean_position[0] - ghost_position[0]) + abs(mean_position[1] - ghost_position[1])
+    variance = 0
+    for i in range(M):
+        for j in range(N):
+            distance = abs(mean_position[0] - i) + abs(mean_position[1] - j)
+            variance += (distance ** 2) * belief[i][j]
+    return variance ** 0.5, quality
+
+
+def random_beliefs(rng, shape):
+    beliefs = rng.random_sample(shape) ** 4
+    return beliefs / beliefs.sum(axis=(-2, -1), keepdims=True)
+
+
+def test_statistics_match_baseline_metrics():
+    rng = np.random.RandomState(0)
+    beliefs = random_beliefs(rng, (3, 7, 5))
+    ghost_positions = rng.randint(5, size=(3, 2))
+
+    statistics = belief_statistics(beliefs, ghost_positions)
+    for z in range(3):
+        std, quality = baseline_metrics(beliefs[z], ghost_positions[z])
+        assert np.isclose(statistics["spread"][z], std)
+        assert statistics["mean_error"][z] == quality
+
+
+def test_batched_statistics_match_per_tick_statistics():
+    rng = np.random.RandomState(1)
+    beliefs = random_beliefs(rng, (4, 2, 6, 5))
+    ghost_positions = rng.randint(5, size=(4, 2, 2))
+
+    batched = belief_statistics(beliefs, ghost_positions)
+    for value in batched.values():
+        assert value.shape[:2] == (4, 2)
+    for t in range(4):
+        statistics = belief_statistics(beliefs[t], ghost_positions[t])
+        for key, value in statistics.items():
+            np.testing.assert_allclose(batched[key][t], value)
+
+
+def test_zero_mass_beliefs_give_nan():
+    rng = np.random.RandomState(2)
+    beliefs = random_beliefs(rng, (2, 6, 5))
+    beliefs[1] = 0
+
+    statistics = belief_statistics(beliefs, [[1, 1], [2, 2]])
+    for key in ["mean", "spread", "mean_error"]:
+        assert not np.isnan(statistics[key][0]).any()
+        assert np.isnan(statistics[key][1]).all()
+    assert statistics["entropy"][1] == 0
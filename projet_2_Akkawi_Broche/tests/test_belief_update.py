@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+# n = 3 sensor trials: n * p = 1.5 so the evidences are not integers
+SENSOR_VARIANCE = 0.75
+
+
+def baseline_sensor_model(walls, n, p, pacman_position, evidence):
+    """
+    The per-cell sensor model the PMF table lookup replaced.
+    """
+    from scipy.stats import binom
+
+    sensor_model = np.zeros((walls.width, walls.height))
+    for i in range(walls.width):
+        for j in range(walls.height):
+            distance = abs(i - pacman_position[0]) + abs(j - pacman_position[1])
+            sensor_model[i][j] = binom.pmf(evidence - distance + n * p, n, p)
+    return sensor_model
+
+
+def baseline_updated_belief(agent, belief, evidences, pacman_position, ghosts_eaten):
+    """
+    The per-ghost loop the batched sparse update replaced, on the dense
+    transition model.
+    """
+    walls = agent.walls
+    trans_model = agent._get_transition_model(pacman_position)
+    for e in range(len(belief)):
+        push = np.zeros((walls.width, walls.height))
+        if ghosts_eaten[e] == 0:
+            sensor_model = baseline_sensor_model(walls, agent.n, agent.p, pacman_position, evidences[e])
+            for i in range(walls.width):
+                for j in range(walls.height):
+                    if (not walls[i][j]) and (not pacman_position == (i, j)):
+                        for u in range(walls.width):
+                            for v in range(walls.height):
+                                push[i][j] += trans_model[i][j][u][v] * belief[e][u][v]
+            belief[e] = sensor_model * push
+            alpha = np.sum(belief[e])
+            if alpha != 0:
+                belief[e] = np.divide(belief[e], alpha)
+        else:
+            belief[e] = np.zeros((walls.width, walls.height))
+    return belief
+
+
+def random_belief(rng, walls):
+    belief = rng.random_sample((walls.width, walls.height)) * np.logical_not(walls.data)
+    return belief / belief.sum()
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_sensor_model_matches_baseline_on_non_integer_evidences(random_walls, new_agent, seed):
+    walls = random_walls(seed)
+    agent = new_agent(walls, sensorvariance=SENSOR_VARIANCE)
+    assert agent.n * agent.p == 1.5
+    pacman_position = (1, 1)
+
+    for evidence in [-1.5, 0.5, 2.5, 4.5, 3.0, 7.25]:
+        np.testing.assert_allclose(agent._get_sensor_model(pacman_position, evidence),
+                                   baseline_sensor_model(walls, agent.n, agent.p, pacman_position, evidence),
+                                   rtol=1e-12, atol=0)
+
+
+@pytest.mark.parametrize("ghost_type", ["scared", "confused"])
+@pytest.mark.parametrize("seed", range(4))
+def test_updated_belief_matches_baseline_loop(random_walls, new_agent, ghost_type, seed):
+    rng = np.random.RandomState(seed)
+    walls = random_walls(seed)
+    agent = new_agent(walls, ghostagent=ghost_type, sensorvariance=SENSOR_VARIANCE)
+    cells = [(x, y) for x in range(walls.width) for y in range(walls.height) if not walls[x][y]]
+    neighbours = {(x, y): [c for c in [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)] if c in cells]
+                  for x, y in cells}
+    cells = [c for c in cells if neighbours[c]]
+
+    # three ghosts, the second one eaten, walking a few ticks so that the
+    # pacman cell holds some belief mass to zero out
+    belief = [random_belief(rng, walls) for _ in range(3)]
+    expected = [b.copy() for b in belief]
+    ghosts_eaten = [False, True, False]
+    ghost_positions = [cells[i] for i in rng.randint(len(cells), size=3)]
+    for _ in range(3):
+        ghost_positions = [neighbours[c][rng.randint(len(neighbours[c]))] for c in ghost_positions]
+        free_cells = [c for c in cells if c not in ghost_positions]
+        pacman_position = free_cells[rng.randint(len(free_cells))]
+        noise = rng.randint(agent.n + 1, size=3) - agent.n * agent.p
+        evidences = [abs(x - pacman_position[0]) + abs(y - pacman_position[1]) + noise[z]
+                     for z, (x, y) in enumerate(ghost_positions)]
+
+        belief = agent._get_updated_belief(belief, evidences, pacman_position, ghosts_eaten)
+        expected = baseline_updated_belief(agent, expected, evidences, pacman_position, ghosts_eaten)
+
+        assert len(belief) == 3
+        for z in range(3):
+            assert belief[z].shape == (walls.width, walls.height)
+            np.testing.assert_allclose(belief[z], expected[z], rtol=1e-9, atol=1e-12)
+        assert not belief[1].any()
+        assert np.isclose(belief[0].sum(), 1) and np.isclose(belief[2].sum(), 1)
+        assert belief[0][pacman_position] == 0 and belief[2][pacman_position] == 0
+
+
+def test_updated_belief_without_consistent_cell_stays_zero(random_walls, new_agent):
+    walls = random_walls(0)
+    agent = new_agent(walls, sensorvariance=SENSOR_VARIANCE)
+    rng = np.random.RandomState(0)
+    belief = [random_belief(rng, walls)]
+    pacman_position = next((x, y) for x in range(walls.width) for y in range(walls.height) if not walls[x][y])
+
+    # integer evidences are outside of the support when n * p = 1.5
+    updated = agent._get_updated_belief([belief[0].copy()], [2.0], pacman_position, [False])
+    expected = baseline_updated_belief(agent, belief, [2.0], pacman_position, [False])
+    assert not updated[0].any()
+    np.testing.assert_array_equal(updated[0], expected[0])
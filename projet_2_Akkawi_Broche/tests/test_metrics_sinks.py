@@ -0,0 +1,47 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics  # noqa: E402
+
+COLUMNS = ["tick", "value"]
+
+
+def test_npz_sinks_on_same_path_keep_every_row(tmp_path):
+    path = str(tmp_path / "metrics.npz")
+    first = metrics.make_metrics_sink("npz", path, COLUMNS, flush_interval=2)
+    second = metrics.make_metrics_sink("npz", path, COLUMNS, flush_interval=2)
+
+    for tick in range(5):
+        first.record([tick, 1.0])
+        second.record([tick, 2.0])
+    first.close()
+    second.close()
+
+    loaded = metrics.load_metrics(path)
+    assert len(loaded["tick"]) == 10
+    assert sorted(loaded["value"].tolist()) == [1.0] * 5 + [2.0] * 5
+
+
+def test_close_flushes_and_releases_the_sink(tmp_path):
+    path = str(tmp_path / "metrics.txt")
+    sink = metrics.make_metrics_sink("text", path, COLUMNS, flush_interval=100)
+    sink.record([0, 0.5])
+    assert sink in metrics._open_sinks
+
+    sink.close()
+    sink.close()
+    assert sink not in metrics._open_sinks
+    np.testing.assert_array_equal(metrics.load_metrics(path), [[0, 0.5]])
+
+
+def test_pending_sinks_are_closed_in_creation_order(tmp_path):
+    path = str(tmp_path / "metrics.txt")
+    for game in range(3):
+        metrics.make_metrics_sink("text", path, COLUMNS).record([game, 0.0])
+
+    metrics._close_open_sinks()
+    np.testing.assert_array_equal(metrics.load_metrics(path)[:, 0], [0, 1, 2])
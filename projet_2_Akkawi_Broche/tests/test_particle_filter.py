@@ -0,0 +1,83 @@
+import numpy as np
+
+
+def open_cells(walls):
+    return [(x, y) for x in range(walls.width) for y in range(walls.height) if not walls[x][y]]
+
+
+def point_belief(walls, position):
+    belief = np.zeros((walls.width, walls.height))
+    belief[position] = 1.
+    return belief
+
+
+def test_propagation_histogram_converges_to_transition_column(random_walls, new_agent, monkeypatch):
+    np.random.seed(0)
+    walls = random_walls(1)
+    agent = new_agent(walls, ghostagent="scared", inference="particles", nparticles=20000)
+    # uniform likelihood: the resampling keeps every particle
+    monkeypatch.setattr(agent, "_get_sensor_probability",
+                        lambda evidences, distances: np.ones(np.broadcast(evidences, distances).shape))
+
+    cells = open_cells(walls)
+    pacman_position = cells[0]
+    adjacency = agent._get_adjacency()
+    start = adjacency.positions[int(np.argmax(np.diff(adjacency.offsets)))]
+    belief = agent._get_particle_belief([point_belief(walls, start)], [0.], pacman_position, [False])
+
+    column = agent._get_transition_model(pacman_position)[:, :, start[0], start[1]]
+    assert np.count_nonzero(column) >= 2
+    np.testing.assert_array_equal(belief[0] > 0, column > 0)
+    np.testing.assert_allclose(belief[0], column, atol=0.02)
+
+
+def test_particle_beliefs_stay_normalized(random_walls, new_agent):
+    np.random.seed(1)
+    walls = random_walls(2)
+    agent = new_agent(walls, inference="particles", nparticles=500)
+    cells = open_cells(walls)
+    uniform = np.logical_not(walls.data) / float(len(cells))
+    belief = [uniform.copy(), uniform.copy()]
+
+    ghost_position = cells[-1]
+    for tick in range(10):
+        pacman_position = cells[tick % len(cells)]
+        distance = abs(ghost_position[0] - pacman_position[0]) + abs(ghost_position[1] - pacman_position[1])
+        belief = agent._get_particle_belief(belief, [distance, distance], pacman_position, [False, False])
+
+        assert agent._particles.shape == (2, 500)
+        for b in belief:
+            assert b.shape == (walls.width, walls.height)
+            assert np.isclose(b.sum(), 1)
+            assert not b[np.array(walls.data, dtype=bool)].any()
+
+
+def test_eaten_ghosts_get_zero_beliefs(random_walls, new_agent):
+    np.random.seed(2)
+    walls = random_walls(3)
+    agent = new_agent(walls, inference="particles", nparticles=200)
+    cells = open_cells(walls)
+    uniform = np.logical_not(walls.data) / float(len(cells))
+
+    belief = agent._get_particle_belief([uniform.copy(), uniform.copy()], [2., 2.], cells[0], [False, True])
+    assert belief[1].shape == (walls.width, walls.height)
+    assert not belief[1].any()
+    assert np.isclose(belief[0].sum(), 1)
+
+
+def test_inconsistent_particles_are_drawn_again_from_the_sensor_model(random_walls, new_agent):
+    np.random.seed(3)
+    walls = random_walls(0, width=9, height=7, density=0.)
+    agent = new_agent(walls, inference="particles", nparticles=300)
+    pacman_position = (1, 1)
+    far_corner = (walls.width - 2, walls.height - 2)
+
+    # the particles all lie around the far corner (distance 9 to 11) while
+    # the sensor supports distances 4 to 8 only (n = 4, evidence = 6)
+    belief = agent._get_particle_belief([point_belief(walls, far_corner)], [6.], pacman_position, [False])
+
+    likelihood = agent._get_sensor_model(pacman_position, 6.)
+    likelihood[np.array(walls.data, dtype=bool)] = 0
+    assert np.isclose(belief[0].sum(), 1)
+    assert not belief[0][likelihood == 0].any()
+    assert belief[0][pacman_position] == 0
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+GHOST_TYPES = ["scared", "afraid", "confused"]
+
+
+def baseline_transition_model(walls, pacman_position, ghost_type):
+    """
+    The four-loop transition model the sparse model replaced, kept as the
+    reference of its probabilities.
+    """
+    width, height = walls.width, walls.height
+    transition_model = np.zeros((width, height, width, height))
+    k = 1
+    if ghost_type == "scared":
+        k = 3
+    if ghost_type == "afraid":
+        k = 1
+    if ghost_type == "confused":
+        k = 0
+    normalizer = dict()
+    for w1 in range(width):
+        for h1 in range(height):
+            if not walls[w1][h1]:
+                t_plus_1_distance = abs(pacman_position[0] - w1) + abs(pacman_position[1] - h1)
+                for w2 in range(width):
+                    for h2 in range(height):
+                        normalizer.setdefault((w2, h2), 0)
+                        if ((w1 == w2 + 1 and h1 == h2) or (w1 == w2 - 1 and h1 == h2)
+                                or (w1 == w2 and h1 == h2 + 1) or (w1 == w2 and h1 == h2 - 1)) \
+                                and not walls[w2][h2]:
+                            t_distance = abs(pacman_position[0] - w2) + abs(pacman_position[1] - h2)
+                            if t_plus_1_distance > t_distance:
+                                transition_model[w1][h1][w2][h2] = np.power(2, k)
+                                normalizer[(w2, h2)] += np.power(2, k)
+                            else:
+                                transition_model[w1][h1][w2][h2] = 1
+                                normalizer[(w2, h2)] += 1
+    for w1 in range(width):
+        for h1 in range(height):
+            for w2 in range(width):
+                for h2 in range(height):
+                    if not walls[w2][h2] and normalizer[(w2, h2)] != 0:
+                        transition_model[w1][h1][w2][h2] = transition_model[w1][h1][w2][h2] / normalizer[(w2, h2)]
+    return transition_model
+
+
+@pytest.mark.parametrize("ghost_type", GHOST_TYPES)
+@pytest.mark.parametrize("seed", range(4))
+def test_transition_model_matches_baseline_loops(random_walls, new_agent, ghost_type, seed):
+    walls = random_walls(seed)
+    agent = new_agent(walls, ghostagent=ghost_type)
+    cells = [(x, y) for x in range(walls.width) for y in range(walls.height) if not walls[x][y]]
+    pacman_position = cells[np.random.RandomState(seed).randint(len(cells))]
+
+    expected = baseline_transition_model(walls, pacman_position, ghost_type)
+    np.testing.assert_array_equal(agent._get_transition_model(pacman_position), expected)
+
+    sparse_model = agent._get_sparse_transition_model(pacman_position)
+    np.testing.assert_array_equal(sparse_model.toarray(),
+                                  expected.reshape((walls.width * walls.height, -1)))